@@ -6,37 +6,124 @@ and schemas/atom.json
 """
 
 import json
+import sys
+import threading
 import uuid
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass, asdict
+import itertools
+from typing import Dict, Iterable, List, Optional, Union, Any
+from dataclasses import dataclass, field, asdict
 
+# orjson is optional; the stdlib json module is used when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+# ijson is optional; without it load_json_stream parses the whole file
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def _dump_json(data: Any, indent: bool = False) -> bytes:
+    """Encode data as UTF-8 JSON, compact unless indent is set"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _load_json(payload: bytes) -> Any:
+    """Decode UTF-8 JSON bytes"""
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+# Atom ids come from a process-wide counter ("n:0", "l:1", ...). Set
+# USE_UUID_IDS when atoms created by several processes must be merged.
+# _ID_LOCK guards drawing from the counter against it being replaced.
+USE_UUID_IDS = False
+_ID_COUNTER = itertools.count()
+_ID_LOCK = threading.Lock()
+
+
+def _new_atom_id(prefix: str = "") -> str:
+    """Allocate a fresh atom id"""
+    if USE_UUID_IDS:
+        return f"{prefix}{uuid.uuid4()}"
+    with _ID_LOCK:
+        number = next(_ID_COUNTER)
+    return f"{prefix}{number}"
+
+
+# Type index keys ("ConceptNode:ConceptNode", ...) built once per
+# (class, subtype) pair instead of formatted on every add/remove
+_TYPE_KEYS: Dict[tuple, str] = {}
+
+
+def _type_key(atom) -> str:
+    """Index key for an atom's class and subtype"""
+    pair = (atom.__class__, atom.subtype)
+    key = _TYPE_KEYS.get(pair)
+    if key is None:
+        key = _TYPE_KEYS[pair] = sys.intern(f"{atom.__class__.__name__}:{atom.subtype}")
+    return key
+
+
+def _reserve_atom_id(atom_id: str):
+    """Move the id counter past a numeric id that was given explicitly"""
+    global _ID_COUNTER
+    suffix = atom_id[2:] if atom_id[:2] in ("n:", "l:") else atom_id
+    if suffix.isdigit():
+        with _ID_LOCK:
+            current = next(_ID_COUNTER)
+            _ID_COUNTER = itertools.count(max(current, int(suffix) + 1))
+
+
+@dataclass(slots=True, frozen=True)
 class TruthValue:
-    """Simple Truth Value (s, c) implementation"""
+    """Simple Truth Value (s, c) implementation, immutable once created"""
     s: float  # strength [0,1]
     c: float  # confidence [0,1]
+    _dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        self.s = max(0.0, min(1.0, self.s))
-        self.c = max(0.0, min(1.0, self.c))
+        s, c = self.s, self.c
+        object.__setattr__(self, "s", 0.0 if s < 0.0 else (1.0 if s > 1.0 else s))
+        object.__setattr__(self, "c", 0.0 if c < 0.0 else (1.0 if c > 1.0 else c))
+    
+    @classmethod
+    def unchecked(cls, s: float, c: float) -> 'TruthValue':
+        """Build from values already known to be in [0,1], skipping the clamp"""
+        tv = object.__new__(cls)
+        object.__setattr__(tv, "s", s)
+        object.__setattr__(tv, "c", c)
+        object.__setattr__(tv, "_dict", None)
+        return tv
     
     def __str__(self):
         return f"TV(s={self.s:.3f}, c={self.c:.3f})"
     
     def to_dict(self):
-        return {"s": self.s, "c": self.c}
+        """Export as {"s", "c"}; the dict is built once and shared, so treat it as read-only"""
+        result = self._dict
+        if result is None:
+            result = {"s": self.s, "c": self.c}
+            object.__setattr__(self, "_dict", result)
+        return result
 
 
-@dataclass
+@dataclass(slots=True)
 class AttentionValue:
     """Attention Value (sti, lti) implementation"""
     sti: float = 0.0  # short-term importance [0,1]
     lti: float = 0.0  # long-term importance [0,1]
     
     def __post_init__(self):
-        self.sti = max(0.0, min(1.0, self.sti))
-        self.lti = max(0.0, min(1.0, self.lti))
+        sti, lti = self.sti, self.lti
+        self.sti = 0.0 if sti < 0.0 else (1.0 if sti > 1.0 else sti)
+        self.lti = 0.0 if lti < 0.0 else (1.0 if lti > 1.0 else lti)
     
     def __str__(self):
         return f"AV(sti={self.sti:.3f}, lti={self.lti:.3f})"
@@ -48,10 +135,20 @@ class AttentionValue:
 class Atom:
     """Base Atom class following schema/atom.json"""
     
+    # Atoms are the most numerous objects; slots drop the per-instance dict
+    __slots__ = ("id", "subtype", "name", "tv", "av", "meta")
+    
+    _id_prefix = ""
+    
     def __init__(self, id: str = None, subtype: str = "", name: str = "", 
                  tv: TruthValue = None, av: AttentionValue = None, meta: dict = None):
-        self.id = id or str(uuid.uuid4())
-        self.subtype = subtype
+        # Ids and subtypes are interned so the many id-keyed index and
+        # pattern lookups compare by identity instead of by characters
+        if id:
+            # An explicit numeric id must never be handed out again
+            _reserve_atom_id(id)
+        self.id = sys.intern(id or _new_atom_id(self._id_prefix))
+        self.subtype = sys.intern(subtype)
         self.name = name
         self.tv = tv or TruthValue(1.0, 0.0)
         self.av = av or AttentionValue()
@@ -63,7 +160,7 @@ class Atom:
             "id": self.id,
             "type": self.__class__.__name__,
             "subtype": self.subtype,
-            "tv": self.tv.to_dict(),
+            "tv": dict(self.tv.to_dict()),
             "av": self.av.to_dict()
         }
         if self.name:
@@ -85,33 +182,43 @@ class Atom:
 class Node(Atom):
     """Node atom - atomic symbol with subtype"""
     
+    __slots__ = ()
+    
+    _id_prefix = "n:"
+    
     def __init__(self, name: str, subtype: str = "ConceptNode", **kwargs):
         super().__init__(name=name, subtype=subtype, **kwargs)
         if not self.id.startswith('n:'):
-            self.id = f"n:{self.id}"
+            self.id = sys.intern(f"n:{self.id}")
 
 
 class Link(Atom):
     """Link atom - hyperedge with outgoing atoms"""
     
+    __slots__ = ("outgoing_ids",)
+    
+    _id_prefix = "l:"
+    
     def __init__(self, outgoing: List[Union[Atom, str]], subtype: str = "Link", **kwargs):
         super().__init__(subtype=subtype, **kwargs)
         if not self.id.startswith('l:'):
-            self.id = f"l:{self.id}"
+            self.id = sys.intern(f"l:{self.id}")
         
-        # Store outgoing as atom IDs for serialization
-        self.outgoing_ids = []
+        # Store outgoing as a fixed tuple of atom IDs; the id strings are
+        # shared with the target atoms rather than copied
+        outgoing_ids = []
         for atom in outgoing:
             if isinstance(atom, str):
-                self.outgoing_ids.append(atom)
+                outgoing_ids.append(sys.intern(atom))
             elif isinstance(atom, Atom):
-                self.outgoing_ids.append(atom.id)
+                outgoing_ids.append(atom.id)
             else:
                 raise ValueError(f"Invalid outgoing atom type: {type(atom)}")
+        self.outgoing_ids = tuple(outgoing_ids)
     
     def to_dict(self):
         result = super().to_dict()
-        result["out"] = self.outgoing_ids
+        result["out"] = list(self.outgoing_ids)
         return result
     
     def __str__(self):
@@ -120,18 +227,24 @@ class Link(Atom):
 
 class ConceptNode(Node):
     """Concept node for representing concepts"""
+    __slots__ = ()
+    
     def __init__(self, name: str, **kwargs):
         super().__init__(name=name, subtype="ConceptNode", **kwargs)
 
 
 class PredicateNode(Node):
     """Predicate node for representing relations/predicates"""
+    __slots__ = ()
+    
     def __init__(self, name: str, **kwargs):
         super().__init__(name=name, subtype="PredicateNode", **kwargs)
 
 
 class NumberNode(Node):
     """Number node for representing numeric values"""
+    __slots__ = ("value",)
+    
     def __init__(self, value: Union[int, float], **kwargs):
         name = str(value)
         super().__init__(name=name, subtype="NumberNode", **kwargs)
@@ -140,54 +253,133 @@ class NumberNode(Node):
 
 class InheritanceLink(Link):
     """Inheritance link: A inherits from B"""
+    __slots__ = ()
+    
     def __init__(self, source: Union[Atom, str], target: Union[Atom, str], **kwargs):
         super().__init__([source, target], subtype="InheritanceLink", **kwargs)
 
 
 class ImplicationLink(Link):
     """Implication link: A implies B"""
+    __slots__ = ()
+    
     def __init__(self, antecedent: Union[Atom, str], consequent: Union[Atom, str], **kwargs):
         super().__init__([antecedent, consequent], subtype="ImplicationLink", **kwargs)
 
 
 class EvaluationLink(Link):
     """Evaluation link: Predicate(Args...)"""
+    __slots__ = ()
+    
     def __init__(self, predicate: Union[Atom, str], arguments: Union[Atom, str], **kwargs):
         super().__init__([predicate, arguments], subtype="EvaluationLink", **kwargs)
 
 
 class ListLink(Link):
     """List link: ordered list of atoms"""
+    __slots__ = ()
+    
     def __init__(self, items: List[Union[Atom, str]], **kwargs):
         super().__init__(items, subtype="ListLink", **kwargs)
 
 
 class AtomSpace:
-    """AtomSpace container and operations"""
+    """
+    AtomSpace container and operations
+    
+    Writers (add_atom, remove_atom, clear) serialize on a single lock. Readers
+    never lock: index buckets hold the atoms themselves and each query copies
+    one bucket in a single step, so a racing writer is never observed
+    half-done.
+    """
     
     def __init__(self):
+        self._write_lock = threading.Lock()
         self.atoms: Dict[str, Atom] = {}
-        self.index_by_type: Dict[str, List[str]] = {}
-        self.index_by_name: Dict[str, List[str]] = {}
+        self.links: Dict[str, 'Link'] = {}  # subset of atoms that are Links
+        self.links_by_class: Dict[type, Dict[str, 'Link']] = {}  # exact Link class -> its links
+        # Indexes map a key to an insertion-ordered {atom id: atom} bucket
+        self.index_by_type: Dict[str, Dict[str, Atom]] = {}
+        self.index_by_name: Dict[str, Dict[str, Atom]] = {}
+        self.index_incoming: Dict[str, Dict[str, Link]] = {}  # atom id -> links pointing at it
+        # Bumped on every add/remove/clear so callers can tell when state
+        # derived from the atom table has gone stale
+        self._version = 0
+        # (link class, outgoing names) -> link index, built on first use by
+        # find_link and then kept up to date by the writers
+        self._by_type_endpoints: Optional[Dict[tuple, Link]] = None
     
     def add_atom(self, atom: Atom) -> Atom:
         """Add atom to atomspace"""
-        self.atoms[atom.id] = atom
-        
-        # Update type index
-        atom_type = f"{atom.__class__.__name__}:{atom.subtype}"
-        if atom_type not in self.index_by_type:
-            self.index_by_type[atom_type] = []
-        self.index_by_type[atom_type].append(atom.id)
-        
-        # Update name index (for nodes with names)
-        if hasattr(atom, 'name') and atom.name:
-            if atom.name not in self.index_by_name:
-                self.index_by_name[atom.name] = []
-            self.index_by_name[atom.name].append(atom.id)
+        type_key = _type_key(atom)
+        # Re-intern in case the id was reassigned after construction
+        atom.id = sys.intern(atom.id)
+        with self._write_lock:
+            self._version += 1
+            self._index_endpoints(atom)
+            self.atoms[atom.id] = atom
+            
+            # Update type index
+            self.index_by_type.setdefault(type_key, {})[atom.id] = atom
+            
+            # Update name index (for nodes with names)
+            if hasattr(atom, 'name') and atom.name:
+                self.index_by_name.setdefault(atom.name, {})[atom.id] = atom
+            
+            # Update link registry and incoming index (reverse of Link.outgoing_ids)
+            if isinstance(atom, Link):
+                self.links[atom.id] = atom
+                self.links_by_class.setdefault(atom.__class__, {})[atom.id] = atom
+                for out_id in atom.outgoing_ids:
+                    self.index_incoming.setdefault(out_id, {})[atom.id] = atom
         
         return atom
     
+    def remove_atom(self, atom: Atom) -> bool:
+        """Remove atom from atomspace, returns False if it was not present"""
+        with self._write_lock:
+            if self.atoms.pop(atom.id, None) is None:
+                return False
+            self._version += 1
+            # An earlier link with the same endpoints may win again; rebuild
+            self._by_type_endpoints = None
+            
+            self._discard_from_index(self.index_by_type, _type_key(atom), atom.id)
+            if atom.name:
+                self._discard_from_index(self.index_by_name, atom.name, atom.id)
+            if isinstance(atom, Link):
+                self.links.pop(atom.id, None)
+                self._discard_from_index(self.links_by_class, atom.__class__, atom.id)
+                for out_id in atom.outgoing_ids:
+                    self._discard_from_index(self.index_incoming, out_id, atom.id)
+        
+        return True
+    
+    def _index_endpoints(self, atom: Atom):
+        """Add atom to the find_link index, if built; called under the write lock"""
+        index = self._by_type_endpoints
+        if index is None:
+            return
+        if atom.id in self.atoms or atom.id in self.index_incoming:
+            # Replacing an atom or adding an endpoint of existing links
+            # changes the keys of other links; rebuild on next use
+            self._by_type_endpoints = None
+        elif isinstance(atom, Link):
+            index[self._endpoint_key(atom)] = atom
+    
+    def _endpoint_key(self, link: Link) -> tuple:
+        """find_link index key of link"""
+        return (link.__class__, tuple(atom.name for atom in self.get_outgoing_atoms(link)))
+    
+    @staticmethod
+    def _discard_from_index(index: Dict[str, Dict[str, Atom]], key: str, atom_id: str):
+        """Drop atom_id from index[key], removing the key once it is empty"""
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(atom_id, None)
+            if not ids:
+                del index[key]
+    
     def get_atom(self, id: str) -> Optional[Atom]:
         """Get atom by ID"""
         return self.atoms.get(id)
@@ -199,13 +391,83 @@ class AtomSpace:
         else:
             key = atom_type
         
-        atom_ids = self.index_by_type.get(key, [])
-        return [self.atoms[aid] for aid in atom_ids]
+        return list(self.index_by_type.get(key, {}).values())
     
     def get_atoms_by_name(self, name: str) -> List[Atom]:
         """Get all atoms with given name"""
-        atom_ids = self.index_by_name.get(name, [])
-        return [self.atoms[aid] for aid in atom_ids]
+        return list(self.index_by_name.get(name, {}).values())
+    
+    def get_atom_by_name(self, name: str) -> Optional[Atom]:
+        """Get the first atom added with given name, without copying its bucket"""
+        bucket = self.index_by_name.get(name)
+        return next(iter(bucket.values()), None) if bucket else None
+    
+    def iter_links(self, *classes: type):
+        """
+        Iterate links that are instances of classes, in insertion order
+        
+        Reads a single class bucket directly when only one matching class
+        has links; otherwise filters the link registry.
+        """
+        buckets = [bucket for cls, bucket in tuple(self.links_by_class.items())
+                   if issubclass(cls, classes)]
+        if len(buckets) <= 1:
+            return iter(tuple(buckets[0].values()) if buckets else ())
+        return (link for link in tuple(self.links.values()) if isinstance(link, classes))
+    
+    def normalize_truth_values(self) -> int:
+        """
+        Clamp truth values that lie outside [0,1], returns how many changed
+        
+        Only values built through TruthValue.unchecked can be out of
+        range, so the pass filters atoms in one comprehension and
+        rebuilds just those values.
+        """
+        with self._write_lock:
+            out_of_range = [atom for atom in self.atoms.values()
+                            if (tv := atom.tv).s < 0.0 or tv.s > 1.0 or tv.c < 0.0 or tv.c > 1.0]
+            for atom in out_of_range:
+                atom.tv = TruthValue(atom.tv.s, atom.tv.c)  # constructor clamps
+        return len(out_of_range)
+    
+    def stimulate(self, atom_ids: Iterable[str], amount: float, cap: float = 1.0) -> int:
+        """
+        Raise the STI of the atoms with these ids by amount, capped at cap
+        
+        Ids not in the atomspace are skipped; returns how many atoms changed.
+        """
+        atoms = self.atoms
+        updated = 0
+        for atom_id in atom_ids:
+            atom = atoms.get(atom_id)
+            if atom is not None:
+                av = atom.av
+                av.sti = min(cap, av.sti + amount)
+                updated += 1
+        return updated
+    
+    def count_links(self, *classes: type) -> int:
+        """Number of links that are instances of classes, read from the class buckets"""
+        return sum(len(bucket) for cls, bucket in tuple(self.links_by_class.items())
+                   if issubclass(cls, classes))
+    
+    def find_link(self, link_class: type, *names: str) -> Optional[Link]:
+        """
+        Link of exactly link_class whose outgoing atoms have these names
+        
+        Answered from an index built on first use, under the write lock.
+        Added links are indexed as they arrive; removals and changes to
+        existing endpoints drop the index for a rebuild. When several
+        links match, the last added wins.
+        """
+        index = self._by_type_endpoints
+        if index is None:
+            with self._write_lock:
+                index = self._by_type_endpoints
+                if index is None:
+                    index = {self._endpoint_key(link): link for link in self.links.values()}
+                    self._by_type_endpoints = index
+        return index.get((link_class, names))
     
     def get_outgoing_atoms(self, link: Link) -> List[Atom]:
         """Get the actual outgoing atoms for a link"""
@@ -218,11 +480,7 @@ class AtomSpace:
     
     def get_incoming_atoms(self, atom: Atom) -> List[Link]:
         """Get all links that have this atom in their outgoing set"""
-        result = []
-        for other_atom in self.atoms.values():
-            if isinstance(other_atom, Link) and atom.id in other_atom.outgoing_ids:
-                result.append(other_atom)
-        return result
+        return list(self.index_incoming.get(atom.id, {}).values())
     
     def size(self) -> int:
         """Return number of atoms in atomspace"""
@@ -230,9 +488,15 @@ class AtomSpace:
     
     def clear(self):
         """Clear all atoms"""
-        self.atoms.clear()
-        self.index_by_type.clear()
-        self.index_by_name.clear()
+        with self._write_lock:
+            self._version += 1
+            self._by_type_endpoints = None
+            self.atoms.clear()
+            self.links.clear()
+            self.links_by_class.clear()
+            self.index_by_type.clear()
+            self.index_by_name.clear()
+            self.index_incoming.clear()
     
     def to_dict(self) -> dict:
         """Export atomspace to JSON-compatible dict"""
@@ -253,7 +517,8 @@ class AtomSpace:
         atom_type = data["type"]
         subtype = data["subtype"]
         
-        # Reconstruct truth and attention values
+        # Reconstruct truth and attention values; the data comes from
+        # outside this process, so the constructors clamp it to [0,1]
         tv_data = data.get("tv", {"s": 1.0, "c": 0.0})
         tv = TruthValue(tv_data["s"], tv_data["c"])
         
@@ -292,16 +557,32 @@ class AtomSpace:
         
         return atom
     
-    def save_json(self, filename: str):
-        """Save atomspace to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+    def save_json(self, filename: str, indent: bool = False):
+        """Save atomspace to JSON file (compact unless indent is set)"""
+        payload = _dump_json(self.to_dict(), indent)
+        with open(filename, 'wb') as f:
+            f.write(payload)
     
     def load_json(self, filename: str):
         """Load atomspace from JSON file"""
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        self.from_dict(data)
+        with open(filename, 'rb') as f:
+            payload = f.read()
+        self.from_dict(_load_json(payload))
+    
+    def load_json_stream(self, filename: str):
+        """
+        Load atomspace from JSON file one atom at a time
+        
+        Keeps peak memory at roughly one atom's worth of JSON instead of the
+        whole parsed document. Requires ijson; falls back to load_json.
+        """
+        if ijson is None:
+            self.load_json(filename)
+            return
+        self.clear()
+        with open(filename, 'rb') as f:
+            for atom_data in ijson.items(f, 'atoms.item', use_float=True):
+                self.add_atom(self._atom_from_dict(atom_data))
     
     def __len__(self):
         return self.size()
@@ -6,8 +6,16 @@ Based on cards/moses/program-representation.md and schemas/program.json
 
 import random
 import math
+import bisect
+import heapq
+import itertools
+import operator
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Dict, List, Optional, Union, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 
 
@@ -24,7 +32,137 @@ class DataType(Enum):
     SYMBOL = "Symbol"
 
 
-@dataclass
+# Binary operators that compile to a single C-level call
+_BINARY_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "<": operator.lt,
+    "<=": operator.le,
+    "=": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+}
+
+
+def _safe_divide(numerator: Any, denominator: Any) -> Any:
+    """Division that maps near-zero denominators to 0 / -inf"""
+    if abs(denominator) < 1e-10:  # Safe division
+        return 0 if numerator >= 0 else float('-inf')
+    return numerator / denominator
+
+
+def _op_sub(args: List[Any]) -> Any:
+    """Unary negation or left-to-right subtraction"""
+    if len(args) == 1:
+        return -args[0]
+    return args[0] - sum(args[1:])
+
+
+def _op_mul(args: List[Any]) -> Any:
+    """Product of all arguments"""
+    result = 1
+    for val in args:
+        result *= val
+    return result
+
+
+def _op_mean(args: List[Any]) -> Any:
+    """Arithmetic mean, 0 for no arguments"""
+    return sum(args) / len(args) if args else 0
+
+
+def _op_if(args: List[Any]) -> Any:
+    """Select then/else value by condition"""
+    condition, then_val, else_val = args
+    return then_val if condition else else_val
+
+
+# Operator dispatch table: op name -> function of the evaluated argument list
+_OPS: Dict[str, Callable[[List[Any]], Any]] = {
+    # Arithmetic operators
+    "+": sum,
+    "-": _op_sub,
+    "*": _op_mul,
+    "/": lambda args: _safe_divide(args[0], args[1]),
+    # Comparison operators
+    "<": lambda args: args[0] < args[1],
+    "<=": lambda args: args[0] <= args[1],
+    "=": lambda args: args[0] == args[1],
+    ">=": lambda args: args[0] >= args[1],
+    ">": lambda args: args[0] > args[1],
+    # Logical operators
+    "and": all,
+    "or": any,
+    "not": lambda args: not args[0],
+    # Conditional
+    "if": _op_if,
+    # Aggregates
+    "mean": _op_mean,
+    "sum": sum,
+}
+
+# Operators with a fixed number of arguments: op name -> (arity, error message)
+_OP_ARITY: Dict[str, tuple] = {
+    "/": (2, "Division requires exactly 2 arguments"),
+    "not": (1, "Not requires exactly 1 argument"),
+    "if": (3, "If requires exactly 3 arguments: condition, then, else"),
+}
+
+# Structural identity of expression subtrees: equal trees map to the same
+# id. The table is cleared when full, but ids are never reused, so an id
+# still names one structure; equal trees seen on both sides of a clear
+# just get different ids and miss each other's cache entries.
+_STRUCTURAL_IDS: Dict[tuple, int] = {}
+_STRUCTURAL_IDS_MAXSIZE = 100000
+_NEXT_STRUCTURAL_ID = itertools.count()
+
+# Training sets by content: equal rows (every column, with equal value
+# types) map to the same small integer key. Least recently used sets are dropped past
+# _DATA_KEYS_MAXSIZE; keys are never reused.
+_DATA_KEYS: 'OrderedDict[tuple, int]' = OrderedDict()
+_DATA_KEYS_MAXSIZE = 32
+_NEXT_DATA_KEY = itertools.count()
+
+# Fitness scores shared across evolve() runs:
+# (fitness function, data key) -> {structural id: fitness}, holding the
+# _FITNESS_CACHE_ENTRIES most recently used pairs of at most
+# _FITNESS_CACHE_MAXSIZE scores each
+_FITNESS_CACHE: 'OrderedDict[tuple, Dict[int, float]]' = OrderedDict()
+_FITNESS_CACHE_ENTRIES = 16
+_FITNESS_CACHE_MAXSIZE = 100000
+
+# Suffixes of generated program ids
+_PROGRAM_IDS = itertools.count()
+
+# Memoized program results keyed by (structural id, variable assignment)
+_EVAL_CACHE: Dict[tuple, Any] = {}
+_EVAL_CACHE_MAXSIZE = 8192
+
+# Source-compiled expressions keyed by (structural id, variable layout)
+_SOURCE_CACHE: Dict[tuple, Callable[[Any], Any]] = {}
+_SOURCE_CACHE_MAXSIZE = 8192
+
+# Python operators for the binary ops that compile to inline source
+_SOURCE_OPS: Dict[str, str] = {
+    "+": "+", "-": "-", "*": "*",
+    "<": "<", "<=": "<=", "=": "==", ">=": ">=", ">": ">",
+}
+
+
+def _lru_get(table: OrderedDict, key, maxsize: int, default: Callable[[], Any]) -> Any:
+    """table[key], added from default() if missing, keeping the maxsize most recently used keys"""
+    try:
+        table.move_to_end(key)
+        return table[key]
+    except KeyError:
+        value = table[key] = default()
+        if len(table) > maxsize:
+            table.popitem(last=False)
+        return value
+
+
+@dataclass(slots=True)
 class Expression:
     """Expression node in program tree"""
     kind: ExprKind
@@ -33,13 +171,65 @@ class Expression:
     op: str = None
     args: List['Expression'] = None
     data_type: DataType = DataType.REAL
+    # Per-node caches, filled on first use (see size/structural_id/folded_value)
+    _structural_id: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _size: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _const_value: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.args is None:
             self.args = []
+        if self.op is not None:
+            self.op = sys.intern(self.op)
+    
+    @property
+    def size(self) -> int:
+        """Number of nodes in this tree, counted once with an explicit stack"""
+        if self._size is None:
+            total = 0
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                total += 1
+                stack.extend(node.args)
+            self._size = total
+        return self._size
+    
+    @property
+    def structural_id(self) -> int:
+        """
+        Integer shared by all structurally equal subtrees
+        
+        Computed once per node; expressions are treated as immutable after
+        their id has been requested.
+        """
+        if self._structural_id is None:
+            key = (self.kind, type(self.value), self.value, self.name, self.op,
+                   tuple(arg.structural_id for arg in self.args))
+            structural_id = _STRUCTURAL_IDS.get(key)
+            if structural_id is None:
+                if len(_STRUCTURAL_IDS) >= _STRUCTURAL_IDS_MAXSIZE:
+                    _STRUCTURAL_IDS.clear()
+                structural_id = _STRUCTURAL_IDS[key] = next(_NEXT_STRUCTURAL_ID)
+            self._structural_id = structural_id
+        return self._structural_id
     
     def to_dict(self) -> Dict[str, Any]:
         """Export to JSON-compatible dict following schema"""
+        result = self._node_dict()
+        stack = [(self, result)]
+        while stack:
+            node, node_dict = stack.pop()
+            if node.args:
+                arg_dicts = node_dict["args"] = []
+                for arg in node.args:
+                    arg_dict = arg._node_dict()
+                    arg_dicts.append(arg_dict)
+                    stack.append((arg, arg_dict))
+        return result
+    
+    def _node_dict(self) -> Dict[str, Any]:
+        """Dict for this node without its children"""
         result = {"kind": self.kind.value}
         
         if self.value is not None:
@@ -48,25 +238,71 @@ class Expression:
             result["name"] = self.name
         if self.op:
             result["op"] = self.op
-        if self.args:
-            result["args"] = [arg.to_dict() for arg in self.args]
         
         return result
     
+    def clone(self) -> 'Expression':
+        """Deep copy of the tree, built with an explicit stack instead of recursion"""
+        root = self._copy_node()
+        stack = [(self, root)]
+        while stack:
+            source, target = stack.pop()
+            for arg in source.args:
+                arg_copy = arg._copy_node()
+                target.args.append(arg_copy)
+                stack.append((arg, arg_copy))
+        return root
+    
+    def _copy_node(self) -> 'Expression':
+        """Copy this node without its children"""
+        node = Expression(kind=self.kind, value=self.value, name=self.name,
+                          op=self.op, data_type=self.data_type)
+        node._structural_id = self._structural_id
+        node._size = self._size
+        node._const_value = self._const_value
+        return node
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Expression':
         """Create expression from dict"""
-        kind = ExprKind(data["kind"])
-        args = [cls.from_dict(arg_data) for arg_data in data.get("args", [])]
-        
+        root = cls._node_from_dict(data)
+        stack = [(data, root)]
+        while stack:
+            node_data, node = stack.pop()
+            for arg_data in node_data.get("args", ()):
+                arg = cls._node_from_dict(arg_data)
+                node.args.append(arg)
+                stack.append((arg_data, arg))
+        return root
+    
+    @classmethod
+    def _node_from_dict(cls, data: Dict[str, Any]) -> 'Expression':
+        """Create a single node from dict, ignoring its args"""
         return cls(
-            kind=kind,
+            kind=ExprKind(data["kind"]),
             value=data.get("value"),
             name=data.get("name"),
-            op=data.get("op"),
-            args=args
+            op=data.get("op")
         )
     
+    def folded_value(self) -> tuple:
+        """
+        (value,) for an operation whose leaves are all constants, else ()
+        
+        Folded once per node on first use, like structural_id. Subtrees
+        that raise are left unfolded so evaluation still raises.
+        """
+        if self._const_value is None:
+            folded = ()
+            if self.kind == ExprKind.OP and all(
+                    arg.kind == ExprKind.CONST or arg.folded_value() for arg in self.args):
+                try:
+                    folded = (self._evaluate_operation({}),)
+                except Exception:
+                    pass
+            self._const_value = folded
+        return self._const_value
+    
     def evaluate(self, variables: Dict[str, Any]) -> Any:
         """Evaluate expression given variable assignments"""
         if self.kind == ExprKind.CONST:
@@ -74,71 +310,173 @@ class Expression:
         elif self.kind == ExprKind.VAR:
             return variables.get(self.name, 0)
         elif self.kind == ExprKind.OP:
+            folded = self.folded_value()
+            if folded:
+                return folded[0]
             return self._evaluate_operation(variables)
         else:
             raise ValueError(f"Unknown expression kind: {self.kind}")
     
     def _evaluate_operation(self, variables: Dict[str, Any]) -> Any:
         """Evaluate operation with given arguments"""
+        # Logical operators and conditionals only evaluate the branches they need
+        if self.op == "and":
+            for arg in self.args:
+                if not arg.evaluate(variables):
+                    return False
+            return True
+        elif self.op == "or":
+            for arg in self.args:
+                if arg.evaluate(variables):
+                    return True
+            return False
+        elif self.op == "if" and len(self.args) == 3:
+            condition, then_expr, else_expr = self.args
+            if condition.evaluate(variables):
+                return then_expr.evaluate(variables)
+            return else_expr.evaluate(variables)
+        
         arg_values = [arg.evaluate(variables) for arg in self.args]
+        return self._apply_operation(arg_values)
+    
+    def _apply_operation(self, arg_values: List[Any]) -> Any:
+        """Apply this node's operator to already evaluated arguments"""
+        fn = _OPS.get(self.op)
+        if fn is None:
+            raise ValueError(f"Unknown operation: {self.op}")
         
-        # Arithmetic operators
-        if self.op == "+":
-            return sum(arg_values)
-        elif self.op == "-":
-            if len(arg_values) == 1:
-                return -arg_values[0]
-            return arg_values[0] - sum(arg_values[1:])
-        elif self.op == "*":
-            result = 1
-            for val in arg_values:
-                result *= val
-            return result
-        elif self.op == "/":
-            if len(arg_values) != 2:
-                raise ValueError("Division requires exactly 2 arguments")
-            denominator = arg_values[1]
-            if abs(denominator) < 1e-10:  # Safe division
-                return 0 if arg_values[0] >= 0 else float('-inf')
-            return arg_values[0] / denominator
-        
-        # Comparison operators
-        elif self.op == "<":
-            return arg_values[0] < arg_values[1]
-        elif self.op == "<=":
-            return arg_values[0] <= arg_values[1]
-        elif self.op == "=":
-            return arg_values[0] == arg_values[1]
-        elif self.op == ">=":
-            return arg_values[0] >= arg_values[1]
-        elif self.op == ">":
-            return arg_values[0] > arg_values[1]
-        
-        # Logical operators
-        elif self.op == "and":
-            return all(arg_values)
-        elif self.op == "or":
-            return any(arg_values)
-        elif self.op == "not":
-            if len(arg_values) != 1:
-                raise ValueError("Not requires exactly 1 argument")
-            return not arg_values[0]
-        
-        # Conditional
-        elif self.op == "if":
-            if len(arg_values) != 3:
-                raise ValueError("If requires exactly 3 arguments: condition, then, else")
-            condition, then_val, else_val = arg_values
-            return then_val if condition else else_val
-        
-        # Aggregates
-        elif self.op == "mean":
-            return sum(arg_values) / len(arg_values) if arg_values else 0
-        elif self.op == "sum":
-            return sum(arg_values)
+        arity = _OP_ARITY.get(self.op)
+        if arity is not None and len(arg_values) != arity[0]:
+            raise ValueError(arity[1])
         
+        return fn(arg_values)
+    
+    def compile(self, var_index: Dict[str, int] = None) -> Callable[[Any], Any]:
+        """
+        Compile expression tree into a closure over variable assignments
+        
+        The tree is walked once; the returned callable evaluates the same
+        semantics as evaluate() without per-node kind/operator dispatch.
+        With var_index, variable names are resolved to positions up front
+        and the closure takes a row sequence instead of a dict.
+        """
+        if self.kind == ExprKind.CONST:
+            value = self.value
+            return lambda variables: value
+        elif self.kind == ExprKind.VAR:
+            name = self.name
+            if var_index is None:
+                return lambda variables: variables.get(name, 0)
+            if name not in var_index:
+                return lambda row: 0
+            idx = var_index[name]
+            return lambda row: row[idx]
+        elif self.kind == ExprKind.OP:
+            folded = self.folded_value()
+            if folded:
+                value = folded[0]
+                return lambda variables: value
+            return self._compile_operation(var_index)
         else:
-            raise ValueError(f"Unknown operation: {self.op}")
+            raise ValueError(f"Unknown expression kind: {self.kind}")
+    
+    def compile_source(self, var_index: Dict[str, int] = None) -> Callable[[Any], Any]:
+        """
+        Compile the whole tree into a single Python function
+        
+        Same calling convention and results as compile(), but the tree is
+        rendered as one Python expression and byte-compiled, so evaluation
+        runs without a function call per node. Functions are shared by
+        structurally equal trees. Trees too deep for the Python compiler
+        fall back to compile().
+        """
+        try:
+            layout = tuple(var_index.items()) if var_index is not None else None
+            key = (self.structural_id, layout)
+        except TypeError:
+            key = None
+        else:
+            fn = _SOURCE_CACHE.get(key)
+            if fn is not None:
+                return fn
+        
+        namespace = {"_div": _safe_divide}
+        try:
+            source = self._source(var_index, namespace)
+            fn = eval(compile(f"lambda v: {source}", "<moses>", "eval"), namespace)
+        except (RecursionError, SyntaxError, MemoryError):
+            return self.compile(var_index)
+        
+        if key is not None:
+            if len(_SOURCE_CACHE) >= _SOURCE_CACHE_MAXSIZE:
+                _SOURCE_CACHE.clear()
+            _SOURCE_CACHE[key] = fn
+        return fn
+    
+    def _source(self, var_index: Optional[Dict[str, int]], namespace: Dict[str, Any]) -> str:
+        """Python source for this subtree; helpers and odd constants go in namespace"""
+        if self.kind == ExprKind.VAR:
+            if var_index is None:
+                return f"v.get({self.name!r}, 0)"
+            idx = var_index.get(self.name)
+            return "0" if idx is None else f"v[{idx}]"
+        
+        if self.kind == ExprKind.CONST:
+            folded = (self.value,)
+        elif self.kind == ExprKind.OP:
+            folded = self.folded_value()
+        else:
+            raise ValueError(f"Unknown expression kind: {self.kind}")
+        if folded:
+            value = folded[0]
+            if type(value) in (bool, int) or (type(value) is float and math.isfinite(value)):
+                return repr(value)
+            name = f"_k{len(namespace)}"
+            namespace[name] = value
+            return name
+        
+        args = [arg._source(var_index, namespace) for arg in self.args]
+        op = self.op
+        
+        if op == "and" or op == "or":
+            if not args:
+                return "True" if op == "and" else "False"
+            return f"bool({f' {op} '.join(args)})"
+        elif op == "if" and len(args) == 3:
+            return f"({args[1]} if {args[0]} else {args[2]})"
+        
+        if len(args) == 2:
+            if op in _SOURCE_OPS:
+                return f"({args[0]} {_SOURCE_OPS[op]} {args[1]})"
+            if op == "/":
+                return f"_div({args[0]}, {args[1]})"
+        
+        name = f"_f{len(namespace)}"
+        namespace[name] = self._apply_operation
+        return f"{name}([{', '.join(args)}])"
+    
+    def _compile_operation(self, var_index: Dict[str, int] = None) -> Callable[[Any], Any]:
+        """Compile operation node, specializing common binary operators"""
+        arg_fns = [arg.compile(var_index) for arg in self.args]
+        
+        if self.op == "and":
+            return lambda variables: all(fn(variables) for fn in arg_fns)
+        elif self.op == "or":
+            return lambda variables: any(fn(variables) for fn in arg_fns)
+        elif self.op == "if" and len(arg_fns) == 3:
+            condition, then_fn, else_fn = arg_fns
+            return lambda variables: then_fn(variables) if condition(variables) else else_fn(variables)
+        
+        if len(arg_fns) == 2:
+            left, right = arg_fns
+            binary = _BINARY_OPS.get(self.op)
+            if binary is not None:
+                return lambda variables: binary(left(variables), right(variables))
+            if self.op == "/":
+                return lambda variables: _safe_divide(left(variables), right(variables))
+        
+        apply = self._apply_operation
+        return lambda variables: apply([fn(variables) for fn in arg_fns])
     
     def __str__(self):
         if self.kind == ExprKind.CONST:
@@ -160,10 +498,16 @@ class Program:
     """Program following schemas/program.json"""
     
     def __init__(self, expression: Expression, id: str = None, meta: Dict[str, Any] = None):
-        self.id = id or f"p:program_{random.randint(1000, 9999)}"
+        # Generated ids come from a counter, not the random module, so
+        # runs seeded through their own rng are not affected by them
+        self.id = id or f"p:program_{next(_PROGRAM_IDS)}"
         self.expression = expression
         self.meta = meta or {}
         self.fitness = None
+        self.fitness_estimated = False  # fitness is a surrogate estimate, not a score
+        self._compiled = None
+        self._compiled_expression = None
+        self._compiled_rows = None  # (expression, var_index, callable)
     
     def to_dict(self) -> Dict[str, Any]:
         """Export to JSON-compatible dict"""
@@ -184,22 +528,200 @@ class Program:
             meta=data.get("meta", {})
         )
     
+    def compile(self, var_index: Dict[str, int] = None) -> Callable[[Any], Any]:
+        """
+        Return the compiled expression, compiling at most once per expression
+        
+        Without var_index the callable takes a variables dict; with it the
+        callable takes row tuples ordered by var_index (see TrainingData).
+        """
+        if var_index is not None:
+            cached = self._compiled_rows
+            if cached is None or cached[0] is not self.expression or cached[1] is not var_index:
+                cached = (self.expression, var_index, self.expression.compile_source(var_index))
+                self._compiled_rows = cached
+            return cached[2]
+        
+        if self._compiled_expression is not self.expression:
+            self._compiled = self.expression.compile_source()
+            self._compiled_expression = self.expression
+        return self._compiled
+    
     def evaluate(self, variables: Dict[str, Any]) -> Any:
-        """Evaluate program with given variable assignments"""
-        return self.expression.evaluate(variables)
+        """
+        Evaluate program with given variable assignments
+        
+        Results are memoized by expression structure and assignment, so
+        elites and copies re-scored in later generations hit the cache.
+        Value types are part of the key, since 1, 1.0 and True hash alike
+        but can evaluate apart.
+        """
+        try:
+            key = (self.expression.structural_id,
+                   frozenset((name, type(value), value) for name, value in variables.items()))
+        except TypeError:
+            # Unhashable constants or variable values: evaluate uncached
+            return self.compile()(variables)
+        
+        if key in _EVAL_CACHE:
+            return _EVAL_CACHE[key]
+        
+        result = self.compile()(variables)
+        if len(_EVAL_CACHE) >= _EVAL_CACHE_MAXSIZE:
+            _EVAL_CACHE.clear()
+        _EVAL_CACHE[key] = result
+        return result
     
     def __str__(self):
         return f"Program({self.id}): {self.expression}"
 
 
+# Marks rows whose evaluation failed inside SharedEvaluator result columns
+_ERROR = object()
+
+
+class SharedEvaluator:
+    """
+    Evaluate expressions column-wise over fixed rows, sharing subtrees
+    
+    Each node is evaluated for all rows at once and its result column is
+    cached by Expression.structural_id, so a subtree that appears in many
+    programs (elites, copies, crossover children) is computed only once.
+    Rows where evaluation fails hold the _ERROR marker; and/or/if only
+    propagate it from the branch lazy evaluation would have taken.
+    """
+    
+    def __init__(self, rows: List[tuple], var_index: Dict[str, int], max_cached: int = 100000):
+        self.rows = rows
+        self.var_index = var_index
+        self.max_cached = max_cached
+        self._columns: Dict[int, List[Any]] = {}
+    
+    def __getstate__(self):
+        # Cached columns are keyed by this process's structural ids, which
+        # mean nothing in another process
+        state = self.__dict__.copy()
+        state["_columns"] = {}
+        return state
+    
+    def evaluate(self, expression: Expression) -> List[Any]:
+        """Return the result column of expression over all rows"""
+        try:
+            key = expression.structural_id
+        except TypeError:
+            # Unhashable constant somewhere in the tree: compute uncached
+            return self._compute(expression)
+        
+        column = self._columns.get(key)
+        if column is None:
+            column = self._compute(expression)
+            if len(self._columns) >= self.max_cached:
+                self._columns.clear()
+            self._columns[key] = column
+        return column
+    
+    def _compute(self, expression: Expression) -> List[Any]:
+        n = len(self.rows)
+        if expression.kind == ExprKind.CONST:
+            return [expression.value] * n
+        elif expression.kind == ExprKind.VAR:
+            idx = self.var_index.get(expression.name)
+            if idx is None:
+                return [0] * n
+            return [row[idx] for row in self.rows]
+        elif expression.kind != ExprKind.OP:
+            raise ValueError(f"Unknown expression kind: {expression.kind}")
+        
+        arg_columns = [self.evaluate(arg) for arg in expression.args]
+        op = expression.op
+        
+        if op == "and" or op == "or":
+            stop_on = op == "or"
+            result = []
+            for values in zip(*arg_columns) if arg_columns else [()] * n:
+                out = not stop_on
+                for value in values:
+                    if value is _ERROR:
+                        out = _ERROR
+                        break
+                    if bool(value) == stop_on:
+                        out = stop_on
+                        break
+                result.append(out)
+            return result
+        
+        if op == "if" and len(arg_columns) == 3:
+            return [_ERROR if condition is _ERROR else (then_val if condition else else_val)
+                    for condition, then_val, else_val in zip(*arg_columns)]
+        
+        if len(arg_columns) == 2 and op in _BINARY_OPS:
+            binary = _BINARY_OPS[op]
+            apply = lambda values: binary(values[0], values[1])
+        elif len(arg_columns) == 2 and op == "/":
+            apply = lambda values: _safe_divide(values[0], values[1])
+        else:
+            apply = expression._apply_operation
+        
+        result = []
+        for values in zip(*arg_columns) if arg_columns else [()] * n:
+            if _ERROR in values:
+                result.append(_ERROR)
+                continue
+            try:
+                result.append(apply(list(values)))
+            except Exception:
+                result.append(_ERROR)
+        return result
+
+
+class TrainingData(list):
+    """
+    Training rows (dicts) plus a tuple form ordered by the evolved variables
+    
+    Built once per evolve() run so fitness functions can score compiled
+    programs against pre-resolved rows instead of re-hashing variable
+    names per node per row. It is still a list of the original dicts, so
+    fitness functions that iterate over dicts keep working unchanged.
+    """
+    
+    def __init__(self, data: List[Dict[str, Any]], variables: List[str], target_key: str):
+        super().__init__(data)
+        self.target_key = target_key
+        self.var_index: Dict[str, int] = {name: i for i, name in enumerate(variables)}
+        self.rows: List[tuple] = [tuple(point.get(name, 0) for name in variables) for point in data]
+        self.targets: List[Any] = [point.get(target_key) for point in data]
+        self.is_bool = bool(self.targets) and all(isinstance(actual, bool) for actual in self.targets)
+        self.evaluator = SharedEvaluator(self.rows, self.var_index)
+        
+        # Content key for sharing fitness scores between runs. It covers
+        # every column, since fitness functions may read more than the
+        # variables and target; value types are part of it since 1, 1.0
+        # and True hash alike but score apart
+        try:
+            content = (tuple(variables), target_key,
+                       tuple(tuple((key, type(value), value) for key, value in point.items())
+                             for point in data))
+            self.data_key: Optional[int] = _lru_get(_DATA_KEYS, content, _DATA_KEYS_MAXSIZE,
+                                                    lambda: next(_NEXT_DATA_KEY))
+        except TypeError:
+            self.data_key = None
+
+
 class ProgramGenerator:
     """Generate random programs for MOSES-like evolution"""
     
+    # Argument counts for operators that are not binary; None means 2-4 args
+    _ARITY = {"not": 1, "if": 3, "mean": None, "sum": None}
+    
     def __init__(self, 
                  variables: List[str],
                  max_depth: int = 4,
-                 operators: List[str] = None):
+                 operators: List[str] = None,
+                 rng: Optional[random.Random] = None):
         self.variables = variables
+        # Random source; defaults to the random module's shared generator,
+        # so random.seed() keeps controlling runs that do not pass their own
+        self.rng = rng if rng is not None else random
         self.max_depth = max_depth
         self.operators = operators or ["+", "-", "*", "/", "<", ">", "=", "and", "or", "not", "if"]
         
@@ -207,32 +729,41 @@ class ProgramGenerator:
         self.const_prob = 0.3
         self.var_prob = 0.3
         self.op_prob = 0.4
+        
+        # Lookup tables for the hot path; rebuild them (by constructing a new
+        # generator) if the probabilities or choice lists are changed
+        self._variables_t = tuple(self.variables)
+        self._operators_t = tuple(self.operators)
+        self._cum_probs = (self.const_prob, self.const_prob + self.var_prob)
     
     def generate_expression(self, depth: int = 0) -> Expression:
         """Generate random expression tree"""
         if depth >= self.max_depth:
             # Force terminal (const or var)
-            if random.random() < 0.5:
+            if self.rng.random() < 0.5:
                 return self.generate_constant()
             else:
                 return self.generate_variable()
         
-        # Choose expression type
-        rand = random.random()
-        if rand < self.const_prob:
+        # Choose expression type: 0 = const, 1 = var, 2 = op
+        kind = bisect.bisect(self._cum_probs, self.rng.random())
+        if kind == 0:
             return self.generate_constant()
-        elif rand < self.const_prob + self.var_prob:
+        elif kind == 1:
             return self.generate_variable()
         else:
             return self.generate_operation(depth)
     
     def generate_constant(self) -> Expression:
         """Generate constant expression"""
-        value = random.choice([
-            random.randint(-10, 10),  # integers
-            random.uniform(-5, 5),    # floats
-            random.choice([True, False])  # booleans
-        ])
+        # Pick the kind of constant first so only one value is drawn
+        kind = self.rng.randrange(3)
+        if kind == 0:
+            value = self.rng.randint(-10, 10)  # integers
+        elif kind == 1:
+            value = self.rng.uniform(-5, 5)    # floats
+        else:
+            value = self.rng.random() < 0.5    # booleans
         
         return Expression(
             kind=ExprKind.CONST,
@@ -241,7 +772,7 @@ class ProgramGenerator:
     
     def generate_variable(self) -> Expression:
         """Generate variable expression"""
-        name = random.choice(self.variables)
+        name = self.rng.choice(self._variables_t)
         return Expression(
             kind=ExprKind.VAR,
             name=name
@@ -249,21 +780,14 @@ class ProgramGenerator:
     
     def generate_operation(self, depth: int) -> Expression:
         """Generate operation expression"""
-        op = random.choice(self.operators)
+        op = self.rng.choice(self._operators_t)
         
         # Determine number of arguments based on operation
-        if op in ["not"]:
-            num_args = 1
-        elif op in ["if"]:
-            num_args = 3
-        elif op in ["mean", "sum"]:
-            num_args = random.randint(2, 4)
-        else:
-            num_args = 2
+        num_args = self._ARITY.get(op, 2)
+        if num_args is None:
+            num_args = self.rng.randint(2, 4)
         
-        args = []
-        for _ in range(num_args):
-            args.append(self.generate_expression(depth + 1))
+        args = [self.generate_expression(depth + 1) for _ in range(num_args)]
         
         return Expression(
             kind=ExprKind.OP,
@@ -277,16 +801,53 @@ class ProgramGenerator:
         return Program(expression)
 
 
+@dataclass
+class _EvaluationContext:
+    """Fitness inputs shared by every candidate, sent once to each worker"""
+    fitness_function: Callable[[Program, List[Dict[str, Any]], str], float]
+    training_data: List[Dict[str, Any]]
+    target_key: str
+
+
+# Set in each worker process by _init_worker
+_WORKER_CONTEXT: Optional[_EvaluationContext] = None
+
+
+def _init_worker(context: _EvaluationContext):
+    """ProcessPoolExecutor initializer: keep the shared fitness inputs"""
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = context
+
+
+def _eval_worker(program_dict: Dict[str, Any]) -> float:
+    """
+    Score one candidate inside a worker process
+    
+    Programs travel as dicts: structural ids are only meaningful in the
+    process that assigned them, so the tree is rebuilt on this side.
+    """
+    context = _WORKER_CONTEXT
+    program = Program.from_dict(program_dict)
+    return context.fitness_function(program, context.training_data, context.target_key)
+
+
 class MOSESEvolver:
     """Simple MOSES-like evolutionary algorithm"""
     
+    # Below this many uncached candidates a generation is scored in-process
+    _MIN_PARALLEL_BATCH = 5
+    
     def __init__(self, 
                  variables: List[str],
                  fitness_function: Callable[[Program, List[Dict[str, Any]]], float],
                  population_size: int = 50,
                  generations: int = 100,
                  mutation_rate: float = 0.1,
-                 crossover_rate: float = 0.7):
+                 crossover_rate: float = 0.7,
+                 max_workers: Optional[int] = 1,
+                 rng: Optional[random.Random] = None,
+                 surrogate_neighbors: int = 0,
+                 surrogate_threshold: float = 0.5):
         
         self.variables = variables
         self.fitness_function = fitness_function
@@ -294,8 +855,24 @@ class MOSESEvolver:
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
+        # Fitness worker processes: 1 scores in-process, None uses every
+        # core. Parallel scoring needs a module-level (picklable) fitness
+        # function.
+        self.max_workers = max_workers
+        # Random source for selection and variation, shared with the
+        # generator; pass random.Random(seed) for a reproducible,
+        # independent run
+        self.rng = rng if rng is not None else random
+        # k-NN fitness surrogate: with surrogate_neighbors > 0, a new
+        # candidate whose estimate from its nearest already-scored programs
+        # falls more than (1 - surrogate_threshold) * |best score| below the
+        # best score keeps the estimate instead of a full evaluation
+        self.surrogate_neighbors = surrogate_neighbors
+        self.surrogate_threshold = surrogate_threshold
+        self._evaluated: Dict[int, tuple] = {}
+        self._best_evaluated = -math.inf
         
-        self.generator = ProgramGenerator(variables)
+        self.generator = ProgramGenerator(variables, rng=self.rng)
         self.population = []
         self.best_programs = []
     
@@ -304,9 +881,34 @@ class MOSESEvolver:
         Evolve population to fit training data
         
         Args:
-            training_data: List of dicts with variable assignments and target values
+            training_data: List of dicts with variable assignments and target values,
+                or a TrainingData built from them for these variables and target_key
             target_key: Key in training_data dicts containing target output
         """
+        # Resolve variables and targets once for the whole run
+        if not isinstance(training_data, TrainingData) or training_data.target_key != target_key:
+            training_data = TrainingData(training_data, self.variables, target_key)
+        fitness_cache = self._fitness_cache(training_data)
+        
+        executor = None
+        workers = self.max_workers if self.max_workers is not None else os.cpu_count()
+        if workers and workers > 1:
+            context = _EvaluationContext(self.fitness_function, training_data, target_key)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(context,))
+        try:
+            return self._evolve(training_data, target_key, fitness_cache, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def _evolve(self, training_data: 'TrainingData', target_key: str,
+                fitness_cache: Dict[int, float],
+                executor: Optional[ProcessPoolExecutor]) -> List[Program]:
+        """Evolution loop of evolve(), scoring through executor when given"""
+        self._evaluated = {}
+        self._best_evaluated = -math.inf
+        
         # Initialize population
         self.population = []
         for _ in range(self.population_size):
@@ -316,15 +918,15 @@ class MOSESEvolver:
         # Evolution loop
         for generation in range(self.generations):
             # Evaluate fitness
-            for program in self.population:
-                program.fitness = self.fitness_function(program, training_data, target_key)
+            self._evaluate_population(training_data, target_key, fitness_cache, executor)
             
             # Sort by fitness (higher is better)
             self.population.sort(key=lambda p: p.fitness, reverse=True)
             
-            # Keep track of best programs
-            if not self.best_programs or self.population[0].fitness > self.best_programs[0].fitness:
-                self.best_programs = self.population[:5].copy()  # Top 5
+            # Keep track of best programs, among those actually scored
+            scored = [program for program in self.population if not program.fitness_estimated]
+            if scored and (not self.best_programs or scored[0].fitness > self.best_programs[0].fitness):
+                self.best_programs = scored[:5]  # Top 5
             
             # Selection and reproduction
             new_population = []
@@ -337,77 +939,267 @@ class MOSESEvolver:
             while len(new_population) < self.population_size:
                 parent1 = self.tournament_selection()
                 
-                if random.random() < self.crossover_rate:
+                if self.rng.random() < self.crossover_rate:
                     parent2 = self.tournament_selection()
                     child = self.crossover(parent1, parent2)
                 else:
                     child = self.copy_program(parent1)
                 
-                if random.random() < self.mutation_rate:
+                if self.rng.random() < self.mutation_rate:
                     child = self.mutate(child)
                 
                 new_population.append(child)
             
             self.population = new_population
         
-        # Final evaluation
-        for program in self.population:
-            program.fitness = self.fitness_function(program, training_data, target_key)
+        # Final evaluation, in full so no estimate is returned as a score
+        self._evaluate_population(training_data, target_key, fitness_cache, executor,
+                                  use_surrogate=False)
         
         self.population.sort(key=lambda p: p.fitness, reverse=True)
         return self.population[:10]  # Return top 10
     
+    def _fitness_cache(self, training_data: 'TrainingData') -> Dict[int, float]:
+        """
+        Scores by structural id for this fitness function and training data
+        
+        Shared by every run on equal data, so restarts and repeated runs
+        skip programs already scored; unhashable data gets a fresh cache.
+        """
+        if training_data.data_key is None:
+            return {}
+        return _lru_get(_FITNESS_CACHE, (self.fitness_function, training_data.data_key),
+                        _FITNESS_CACHE_ENTRIES, dict)
+    
+    def _evaluate_population(self, training_data: 'TrainingData', target_key: str,
+                             cache: Dict[int, float],
+                             executor: Optional[ProcessPoolExecutor],
+                             use_surrogate: bool = True):
+        """
+        Set fitness on every program in the population
+        
+        With an executor, candidates missing from the cache are scored in
+        the worker processes, one submission per distinct structure.
+        Candidates the surrogate rules out are never scored; they keep the
+        estimate with fitness_estimated set.
+        """
+        to_score = []
+        for program in self.population:
+            estimate = self._surrogate_estimate(program, cache) if use_surrogate else None
+            if estimate is None:
+                to_score.append(program)
+            else:
+                program.fitness = estimate
+                program.fitness_estimated = True
+        
+        if executor is not None:
+            pending: Dict[int, Program] = {}
+            for program in to_score:
+                try:
+                    key = program.expression.structural_id
+                except TypeError:
+                    continue
+                if key not in cache:
+                    pending.setdefault(key, program)
+            
+            if len(pending) >= self._MIN_PARALLEL_BATCH:
+                program_dicts = [program.to_dict() for program in pending.values()]
+                scores = executor.map(_eval_worker, program_dicts)
+                cache.update(zip(pending, scores))
+        
+        for program in to_score:
+            program.fitness = self._cached_fitness(program, training_data, target_key, cache)
+            program.fitness_estimated = False
+            if self.surrogate_neighbors > 0:
+                self._record_evaluated(program)
+    
+    def _surrogate_estimate(self, program: Program, cache: Dict[int, float]) -> Optional[float]:
+        """
+        Estimated fitness of an unscored program, or None to score it in full
+        
+        The estimate is the distance-weighted mean fitness of the nearest
+        scored programs by expression_features; it is used only when it
+        is clearly low, and never enters the fitness cache.
+        """
+        k = self.surrogate_neighbors
+        if k <= 0 or len(self._evaluated) < k:
+            return None
+        try:
+            if program.expression.structural_id in cache:
+                return None
+        except TypeError:
+            return None
+        
+        features = expression_features(program.expression)
+        nearest = heapq.nsmallest(
+            k,
+            ((sum((a - b) * (a - b) for a, b in zip(features, other)), fitness)
+             for other, fitness in self._evaluated.values()),
+            key=operator.itemgetter(0))
+        weights = [1.0 / (1.0 + distance) for distance, _ in nearest]
+        estimate = sum(w * fitness for w, (_, fitness) in zip(weights, nearest)) / sum(weights)
+        
+        # A margin below the best score that holds for either sign of fitness
+        best = self._best_evaluated
+        if estimate < best - (1.0 - self.surrogate_threshold) * abs(best):
+            return estimate
+        return None
+    
+    def _record_evaluated(self, program: Program):
+        """Add a fully scored program to the surrogate's neighbours"""
+        try:
+            key = program.expression.structural_id
+        except TypeError:
+            return
+        if key not in self._evaluated:
+            self._evaluated[key] = (expression_features(program.expression), program.fitness)
+            if program.fitness > self._best_evaluated:
+                self._best_evaluated = program.fitness
+    
+    def _cached_fitness(self, program: Program, training_data: 'TrainingData',
+                        target_key: str, cache: Dict[int, float]) -> float:
+        """
+        Fitness of program, reused for structurally equal programs on the same data
+        
+        Elites and unmutated copies reappear every generation; the training
+        data is fixed for the run, so their score does not change.
+        """
+        try:
+            key = program.expression.structural_id
+        except TypeError:
+            # Unhashable constant somewhere in the tree: score uncached
+            return self.fitness_function(program, training_data, target_key)
+        
+        fitness = cache.get(key)
+        if fitness is None:
+            fitness = self.fitness_function(program, training_data, target_key)
+            if len(cache) >= _FITNESS_CACHE_MAXSIZE:
+                cache.clear()
+            cache[key] = fitness
+        return fitness
+    
     def tournament_selection(self, tournament_size: int = 3) -> Program:
         """Select parent using tournament selection"""
-        tournament = random.sample(self.population, min(tournament_size, len(self.population)))
+        tournament = self.rng.sample(self.population, min(tournament_size, len(self.population)))
         return max(tournament, key=lambda p: p.fitness)
     
     def crossover(self, parent1: Program, parent2: Program) -> Program:
         """Simple crossover by swapping subtrees"""
         # For simplicity, just randomly choose one parent's expression
         # A more sophisticated version would swap random subtrees
-        parent = random.choice([parent1, parent2])
+        parent = self.rng.choice([parent1, parent2])
         return self.copy_program(parent)
     
     def mutate(self, program: Program) -> Program:
         """Mutate program by replacing a random node"""
         # Simple mutation: regenerate a random subtree
-        new_expr = self.generator.generate_expression(depth=random.randint(0, 2))
+        new_expr = self.generator.generate_expression(depth=self.rng.randint(0, 2))
         return Program(new_expr)
     
     def copy_program(self, program: Program) -> Program:
         """Create a copy of a program"""
-        return Program.from_dict(program.to_dict())
+        return Program(program.expression.clone(), id=program.id, meta=dict(program.meta))
 
 
 def accuracy_fitness(program: Program, training_data: List[Dict[str, Any]], target_key: str) -> float:
     """Default fitness function based on accuracy"""
+    if isinstance(training_data, TrainingData) and training_data.target_key == target_key:
+        predictions = training_data.evaluator.evaluate(program.expression)
+        return column_accuracy(predictions, training_data.targets, training_data.is_bool)
+    
+    targets = [data_point.get(target_key) for data_point in training_data]
+    is_bool = bool(targets) and all(isinstance(actual, bool) for actual in targets)
+    return fast_accuracy_fitness(program.compile(), training_data, targets, is_bool)
+
+
+def fast_accuracy_fitness(evaluate: Callable[[Any], Any],
+                          rows: List[Any],
+                          targets: List[Any],
+                          is_bool: bool,
+                          tolerance: float = 0.1) -> float:
+    """
+    Accuracy of a compiled program over pre-extracted targets
+    
+    The classification/regression comparison is chosen once for the whole
+    target column, so each row costs one call and one comparison.
+    Rows on which the program crashes count as incorrect.
+    """
+    correct = 0
+    
+    if is_bool:
+        # For boolean/classification tasks
+        for row, actual in zip(rows, targets):
+            try:
+                if bool(evaluate(row)) == actual:
+                    correct += 1
+            except Exception:
+                pass
+    else:
+        # For regression tasks (with tolerance)
+        for row, actual in zip(rows, targets):
+            try:
+                if abs(evaluate(row) - actual) < tolerance:
+                    correct += 1
+            except Exception:
+                pass
+    
+    total = len(targets)
+    return correct / total if total > 0 else 0.0
+
+
+def column_accuracy(predictions: List[Any],
+                    targets: List[Any],
+                    is_bool: bool,
+                    tolerance: float = 0.1) -> float:
+    """Accuracy of a SharedEvaluator result column against the target column"""
     correct = 0
-    total = 0
     
-    for data_point in training_data:
+    for predicted, actual in zip(predictions, targets):
+        if predicted is _ERROR:
+            continue
         try:
-            predicted = program.evaluate(data_point)
-            actual = data_point[target_key]
-            
-            # For boolean/classification tasks
-            if isinstance(actual, bool):
+            if is_bool:
                 if bool(predicted) == actual:
                     correct += 1
-            # For regression tasks (with tolerance)
-            else:
-                error = abs(predicted - actual)
-                if error < 0.1:  # tolerance
-                    correct += 1
-            
-            total += 1
+            elif abs(predicted - actual) < tolerance:
+                correct += 1
         except Exception:
-            # Penalize programs that crash
-            total += 1
+            pass
     
+    total = len(targets)
     return correct / total if total > 0 else 0.0
 
 
+def column_mean_error(predictions: List[Any],
+                      targets: List[Any],
+                      penalty: float = 100.0,
+                      max_error: Optional[float] = None) -> float:
+    """
+    Mean absolute error of a SharedEvaluator result column against the
+    target column; rows that failed, lack a target or cannot be compared
+    cost penalty
+    
+    With max_error, returns inf as soon as the running total guarantees
+    the mean will exceed it, skipping the remaining rows.
+    """
+    total = len(targets)
+    limit = max_error * total if max_error is not None else math.inf
+    total_error = 0.0
+    
+    for predicted, actual in zip(predictions, targets):
+        if predicted is _ERROR or actual is None:
+            total_error += penalty
+        else:
+            try:
+                total_error += abs(predicted - actual)
+            except Exception:
+                total_error += penalty
+        if total_error > limit:
+            return math.inf
+    
+    return total_error / total if total > 0 else 0.0
+
+
 def mdl_fitness(program: Program, training_data: List[Dict[str, Any]], target_key: str) -> float:
     """Fitness based on Minimum Description Length principle"""
     accuracy = accuracy_fitness(program, training_data, target_key)
@@ -420,7 +1212,25 @@ def mdl_fitness(program: Program, training_data: List[Dict[str, Any]], target_ke
 
 def count_nodes(expression: Expression) -> int:
     """Count number of nodes in expression tree"""
-    count = 1
-    for arg in expression.args:
-        count += count_nodes(arg)
-    return count
\ No newline at end of file
+    return expression.size
+
+
+def expression_features(expression: Expression) -> tuple:
+    """
+    Fixed-length embedding of an expression tree: constant count,
+    variable count, then one count per operator in _OPS order
+    """
+    counts = dict.fromkeys(_OPS, 0)
+    constants = variables = 0
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if node.kind == ExprKind.CONST:
+            constants += 1
+        elif node.kind == ExprKind.VAR:
+            variables += 1
+        else:
+            if node.op in counts:
+                counts[node.op] += 1
+            stack.extend(node.args)
+    return (constants, variables, *counts.values())
\ No newline at end of file
@@ -5,19 +5,43 @@ Based on cards/pattern-mining/hetero-graphs.md
 """
 
 import math
+import sys
+import functools
+import operator
 from typing import Dict, List, Set, Tuple, Optional, Any
-from dataclasses import dataclass
-from collections import defaultdict, Counter
-from .atomspace import AtomSpace, Atom, Node, Link
+from dataclasses import dataclass, field
+from collections import Counter
+from .atomspace import AtomSpace, Atom, Node, Link, _type_key, _dump_json, _load_json
 
+# Natural log of the largest float; larger lifts are reported as infinite
+_MAX_LOG_FLOAT = math.log(sys.float_info.max)
 
-@dataclass
+
+@functools.lru_cache(maxsize=4096)
+def _signature_for_keys(sorted_keys: Tuple[str, ...]) -> str:
+    """Signature string for a sorted tuple of type keys, shared between patterns"""
+    return "|".join(sorted_keys)
+
+
+@dataclass(slots=True)
 class SubgraphMatch:
     """A match of a pattern in the atomspace"""
     pattern_id: str
-    atom_mappings: Dict[str, str]  # pattern_atom_id -> actual_atom_id
+    pattern_atom_ids: Tuple[str, ...]  # template atom ids ...
+    actual_atom_ids: Tuple[str, ...]   # ... and the atom each one matched
     support_score: float = 0.0
     
+    @classmethod
+    def from_mappings(cls, pattern_id: str, atom_mappings: Dict[str, str],
+                      support_score: float = 0.0) -> 'SubgraphMatch':
+        """Create from a pattern_atom_id -> actual_atom_id dict"""
+        return cls(pattern_id, tuple(atom_mappings), tuple(atom_mappings.values()), support_score)
+    
+    @property
+    def atom_mappings(self) -> Dict[str, str]:
+        """pattern_atom_id -> actual_atom_id, built on demand"""
+        return dict(zip(self.pattern_atom_ids, self.actual_atom_ids))
+    
     def to_dict(self):
         return {
             "pattern_id": self.pattern_id,
@@ -26,7 +50,7 @@ class SubgraphMatch:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SubgraphPattern:
     """A discovered pattern in the atomspace"""
     id: str
@@ -36,7 +60,9 @@ class SubgraphPattern:
     lift: float = 0.0  # Lift score
     mdl_gain: float = 0.0  # MDL compression gain
     attention_score: float = 0.0  # Attention-weighted score
+    interestingness: float = 0.0  # Combined ranking score, set with the metrics
     matches: List[SubgraphMatch] = None
+    _signature: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.matches is None:
@@ -98,8 +124,10 @@ class PatternMiner:
                 extensions = self._extend_pattern(pattern)
                 new_patterns.extend(extensions)
             
-            # Filter by support
+            # Filter by support; nothing frequent left means nothing larger can be
             current_patterns = [p for p in new_patterns if p.support >= self.min_support]
+            if not current_patterns:
+                break
         
         # Calculate additional metrics for all patterns
         for pattern in current_patterns:
@@ -108,20 +136,15 @@ class PatternMiner:
                 self.discovered_patterns.append(pattern)
         
         # Sort by interestingness (combination of metrics)
-        self.discovered_patterns.sort(key=self._pattern_interestingness, reverse=True)
+        self.discovered_patterns.sort(key=operator.attrgetter("interestingness"), reverse=True)
         
         return self.discovered_patterns
     
     def _find_frequent_atoms(self) -> Dict[str, List[Atom]]:
         """Find atoms that occur frequently"""
-        atom_groups = defaultdict(list)
-        
-        for atom in self.atomspace.atoms.values():
-            # Group by type and subtype
-            key = f"{atom.__class__.__name__}:{atom.subtype}"
-            atom_groups[key].append(atom)
-        
-        return atom_groups
+        # Group by type and subtype, read straight from the AtomSpace type index
+        return {key: list(bucket.values())
+                for key, bucket in self.atomspace.index_by_type.items()}
     
     def _create_single_atom_pattern(self, atom_type: str, atoms: List[Atom]) -> SubgraphPattern:
         """Create a pattern from a single atom type"""
@@ -138,7 +161,8 @@ class PatternMiner:
         for atom in atoms:
             match = SubgraphMatch(
                 pattern_id=pattern.id,
-                atom_mappings={template_atom.id: atom.id}
+                pattern_atom_ids=(template_atom.id,),
+                actual_atom_ids=(atom.id,)
             )
             pattern.matches.append(match)
         
@@ -146,47 +170,73 @@ class PatternMiner:
     
     def _extend_pattern(self, pattern: SubgraphPattern) -> List[SubgraphPattern]:
         """Extend a pattern by adding connected atoms"""
-        extensions = []
+        # Candidates are deduplicated as they are generated: the signature of
+        # pattern + atom only depends on the atom's type key, so it is built
+        # once per type key and repeat candidates just add to the support
+        extensions: Dict[str, SubgraphPattern] = {}
+        signature_for_key: Dict[str, str] = {}
+        base_keys = [_type_key(atom) for atom in pattern.atoms]
+        
+        get_atom = self.atomspace.atoms.get
+        connected_by_id = self._connected_by_id
         
         # For each match of the current pattern
         for match in pattern.matches:
-            # Find atoms connected to the matched atoms
-            connected_atoms = set()
+            # Find atoms connected to the matched atoms, keyed by id so the
+            # merge hashes plain strings and keeps discovery order
+            connected_atoms: Dict[str, Atom] = {}
             
-            for template_atom_id, actual_atom_id in match.atom_mappings.items():
-                actual_atom = self.atomspace.get_atom(actual_atom_id)
-                if actual_atom:
+            for actual_atom_id in match.actual_atom_ids:
+                actual_atom = get_atom(actual_atom_id)
+                if actual_atom is not None:
                     # Get incoming and outgoing connections
-                    connected_atoms.update(self._get_connected_atoms(actual_atom))
+                    connected_atoms.update(connected_by_id(actual_atom))
             
             # Try to create extended patterns
-            for connected_atom in connected_atoms:
+            for connected_atom in connected_atoms.values():
+                key = _type_key(connected_atom)
+                signature = signature_for_key.get(key)
+                if signature is None:
+                    signature = signature_for_key[key] = _signature_for_keys(tuple(sorted(base_keys + [key])))
+                
+                existing = extensions.get(signature)
+                if existing is not None:
+                    existing.support += 1
+                    continue
+                
                 extended_pattern = self._try_extend_pattern_with_atom(pattern, connected_atom)
                 if extended_pattern:
-                    extensions.append(extended_pattern)
+                    extended_pattern._signature = signature
+                    extensions[signature] = extended_pattern
         
-        # Merge duplicate patterns and calculate support
-        return self._merge_duplicate_patterns(extensions)
+        return list(extensions.values())
     
     def _get_connected_atoms(self, atom: Atom) -> List[Atom]:
         """Get all atoms connected to the given atom"""
-        connected = []
+        return list(self._connected_by_id(atom).values())
+    
+    def _connected_by_id(self, atom: Atom) -> Dict[str, Atom]:
+        """Atoms connected to the given atom, keyed by id in discovery order"""
+        # Resolve ids straight from the atom table and the incoming index,
+        # deduplicating by id as we go
+        atoms = self.atomspace.atoms
+        connected: Dict[str, Atom] = {}
         
         # If it's a link, get its outgoing atoms
         if isinstance(atom, Link):
-            connected.extend(self.atomspace.get_outgoing_atoms(atom))
-        
-        # Get incoming links
-        incoming_links = self.atomspace.get_incoming_atoms(atom)
-        connected.extend(incoming_links)
-        
-        # For incoming links, also get their other outgoing atoms
-        for link in incoming_links:
-            if isinstance(link, Link):
-                outgoing = self.atomspace.get_outgoing_atoms(link)
-                for out_atom in outgoing:
-                    if out_atom.id != atom.id:
-                        connected.append(out_atom)
+            for out_id in atom.outgoing_ids:
+                out_atom = atoms.get(out_id)
+                if out_atom is not None:
+                    connected[out_id] = out_atom
+        
+        # Incoming links, and the other outgoing atoms of each of them
+        for link in self.atomspace.get_incoming_atoms(atom):
+            connected[link.id] = link
+            for out_id in link.outgoing_ids:
+                if out_id != atom.id:
+                    out_atom = atoms.get(out_id)
+                    if out_atom is not None:
+                        connected[out_id] = out_atom
         
         return connected
     
@@ -205,38 +255,36 @@ class PatternMiner:
         
         return extended_pattern
     
-    def _merge_duplicate_patterns(self, patterns: List[SubgraphPattern]) -> List[SubgraphPattern]:
-        """Merge patterns that are structurally equivalent"""
-        # Simplified: just remove exact duplicates
-        # A full implementation would use graph isomorphism
-        
-        unique_patterns = {}
-        
-        for pattern in patterns:
-            # Create a signature based on atom types and structure
-            signature = self._pattern_signature(pattern)
-            
-            if signature not in unique_patterns:
-                unique_patterns[signature] = pattern
-            else:
-                # Merge support
-                unique_patterns[signature].support += 1
-        
-        return list(unique_patterns.values())
-    
     def _pattern_signature(self, pattern: SubgraphPattern) -> str:
         """Create a signature for pattern matching"""
-        # Simple signature based on atom types and subtypes
-        signatures = []
-        for atom in pattern.atoms:
-            signatures.append(f"{atom.__class__.__name__}:{atom.subtype}")
-        
-        return "|".join(sorted(signatures))
+        # Simple signature based on atom types and subtypes, computed once
+        if pattern._signature is None:
+            pattern._signature = _signature_for_keys(tuple(sorted(_type_key(atom) for atom in pattern.atoms)))
+        return pattern._signature
     
     def _calculate_pattern_metrics(self, pattern: SubgraphPattern):
         """Calculate confidence, lift, MDL gain, and attention score"""
+        # One pass over the matches feeds both confidence and attention
+        pattern_size = len(pattern.atoms)
+        get_atom = self.atomspace.atoms.get
+        use_attention = self.use_attention
+        complete_matches = 0
+        total_attention = 0.0
+        attention_count = 0
+        for match in pattern.matches:
+            # Complete match: every atom in the pattern has a corresponding atom
+            if len(match.pattern_atom_ids) == pattern_size:
+                complete_matches += 1
+            if use_attention:
+                for actual_atom_id in match.actual_atom_ids:
+                    atom = get_atom(actual_atom_id)
+                    if atom is not None:
+                        # Weight by short-term importance (STI)
+                        total_attention += atom.av.sti
+                        attention_count += 1
+        
         # Confidence: How often the pattern predicts target relationships
-        pattern.confidence = self._calculate_confidence(pattern)
+        pattern.confidence = complete_matches / len(pattern.matches) if pattern.matches else 0.0
         
         # Lift: How much better than random
         pattern.lift = self._calculate_lift(pattern)
@@ -245,22 +293,11 @@ class PatternMiner:
         pattern.mdl_gain = self._calculate_mdl_gain(pattern)
         
         # Attention score: Weighted by attention values
-        if self.use_attention:
-            pattern.attention_score = self._calculate_attention_score(pattern)
-    
-    def _calculate_confidence(self, pattern: SubgraphPattern) -> float:
-        """Calculate predictive confidence of pattern"""
-        if not pattern.matches:
-            return 0.0
-        
-        # Simple confidence: ratio of matches that have complete structure
-        complete_matches = 0
-        for match in pattern.matches:
-            # Check if all atoms in the pattern have corresponding matches
-            if len(match.atom_mappings) == len(pattern.atoms):
-                complete_matches += 1
+        if use_attention:
+            pattern.attention_score = total_attention / attention_count if attention_count else 0.0
         
-        return complete_matches / len(pattern.matches)
+        # Ranking score, stored so it is computed once per pattern
+        pattern.interestingness = self._pattern_interestingness(pattern)
     
     def _calculate_lift(self, pattern: SubgraphPattern) -> float:
         """Calculate lift score (vs random baseline)"""
@@ -271,12 +308,19 @@ class PatternMiner:
         if total_atoms == 0:
             return 0.0
         
-        # Expected support if random
+        # Actual frequency support/N over the random expectation (1/N)**(k-1)
+        # is support * N**(k-2). Its log decides first whether it fits in a
+        # float; lifts beyond that are infinite rather than an OverflowError
         pattern_size = len(pattern.atoms)
-        expected_random = (1.0 / total_atoms) ** (pattern_size - 1)
-        actual_frequency = pattern.support / total_atoms
-        
-        return actual_frequency / expected_random if expected_random > 0 else 1.0
+        log_lift = math.log(pattern.support) + (pattern_size - 2) * math.log(total_atoms)
+        if log_lift >= _MAX_LOG_FLOAT:
+            return math.inf
+        if pattern_size < 2:
+            return pattern.support / total_atoms ** (2 - pattern_size)
+        try:
+            return float(pattern.support * total_atoms ** (pattern_size - 2))
+        except OverflowError:  # within rounding of the largest float
+            return math.inf
     
     def _calculate_mdl_gain(self, pattern: SubgraphPattern) -> float:
         """Calculate MDL (Minimum Description Length) gain"""
@@ -289,21 +333,6 @@ class PatternMiner:
         
         return matches_size_bits - (pattern_size_bits + pattern_ref_bits)
     
-    def _calculate_attention_score(self, pattern: SubgraphPattern) -> float:
-        """Calculate attention-weighted score"""
-        total_attention = 0.0
-        count = 0
-        
-        for match in pattern.matches:
-            for actual_atom_id in match.atom_mappings.values():
-                atom = self.atomspace.get_atom(actual_atom_id)
-                if atom:
-                    # Weight by short-term importance (STI)
-                    total_attention += atom.av.sti
-                    count += 1
-        
-        return total_attention / count if count > 0 else 0.0
-    
     def _pattern_interestingness(self, pattern: SubgraphPattern) -> float:
         """Combined interestingness score for ranking"""
         # Weighted combination of metrics
@@ -321,11 +350,14 @@ class PatternMiner:
         matches = []
         
         # Simple pattern matching - in practice would use more sophisticated algorithms
-        for atom in self.atomspace.atoms.values():
+        # Only atoms in the template's type bucket can match it
+        bucket = self.atomspace.index_by_type.get(_type_key(pattern.atoms[0]), {})
+        for atom in list(bucket.values()):
             if self._atom_matches_pattern(atom, pattern.atoms[0]):
                 match = SubgraphMatch(
                     pattern_id=pattern.id,
-                    atom_mappings={pattern.atoms[0].id: atom.id}
+                    pattern_atom_ids=(pattern.atoms[0].id,),
+                    actual_atom_ids=(atom.id,)
                 )
                 matches.append(match)
         
@@ -341,10 +373,8 @@ class PatternMiner:
         """Get top N most interesting patterns"""
         return self.discovered_patterns[:n]
     
-    def save_patterns(self, filename: str):
-        """Save discovered patterns to JSON file"""
-        import json
-        
+    def save_patterns(self, filename: str, indent: bool = False):
+        """Save discovered patterns to JSON file (compact unless indent is set)"""
         patterns_data = {
             "patterns": [pattern.to_dict() for pattern in self.discovered_patterns],
             "mining_params": {
@@ -354,15 +384,14 @@ class PatternMiner:
             }
         }
         
-        with open(filename, 'w') as f:
-            json.dump(patterns_data, f, indent=2)
+        payload = _dump_json(patterns_data, indent)
+        with open(filename, 'wb') as f:
+            f.write(payload)
     
     def load_patterns(self, filename: str):
         """Load patterns from JSON file"""
-        import json
-        
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        with open(filename, 'rb') as f:
+            data = _load_json(f.read())
         
         self.discovered_patterns = []
         for pattern_data in data.get("patterns", []):
@@ -384,7 +413,7 @@ class PatternMiner:
             
             # Reconstruct matches
             for match_data in pattern_data.get("matches", []):
-                match = SubgraphMatch(
+                match = SubgraphMatch.from_mappings(
                     pattern_id=match_data["pattern_id"],
                     atom_mappings=match_data["atom_mappings"],
                     support_score=match_data.get("support_score", 0.0)
@@ -5,39 +5,65 @@ Based on cards/pln/uncertain-inference.md and schemas/inference_step.json
 """
 
 import math
+from collections import deque
 from typing import List, Dict, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from .atomspace import Atom, Link, TruthValue, ImplicationLink, InheritanceLink
 
 
-@dataclass
+@dataclass(slots=True)
 class InferenceStep:
     """Inference step following schemas/inference_step.json"""
     rule: str  # deduction, induction, abduction, revision
-    premises: List[Dict[str, Any]]  # [{"id": str, "tv": {"s": float, "c": float}}]
+    premises: Tuple[Tuple[str, float, float], ...]  # ((id, s, c), ...)
     conclusion: Dict[str, str]  # {"id": str}
     tv_in: Optional[Dict[str, float]]  # {"s": float, "c": float}
     tv_out: Dict[str, float]  # {"s": float, "c": float}
     notes: str = ""
     
     def to_dict(self):
-        """Export to JSON-compatible dict"""
-        return asdict(self)
+        """Export to JSON-compatible dict, expanding premises to
+        [{"id": str, "tv": {"s": float, "c": float}}]"""
+        return {
+            "rule": self.rule,
+            "premises": [{"id": atom_id, "tv": {"s": s, "c": c}}
+                         for atom_id, s, c in self.premises],
+            "conclusion": dict(self.conclusion),
+            "tv_in": dict(self.tv_in) if self.tv_in is not None else None,
+            "tv_out": dict(self.tv_out),
+            "notes": self.notes
+        }
 
 
 class PLNReasoner:
     """PLN Reasoner implementing the rules from cards/pln/uncertain-inference.md"""
     
-    def __init__(self, atomspace=None):
+    def __init__(self, atomspace=None, history_cap: Optional[int] = 100_000):
         self.atomspace = atomspace
-        self.inference_history: List[InferenceStep] = []
+        # Most recent steps only; the oldest are dropped once history_cap is
+        # reached (None keeps everything). Step numbers keep counting up.
+        self.inference_history: deque = deque(maxlen=history_cap)
+        self._step_count = 0
         
         # Default parameters (simulated defaults as per card)
         self.epsilon = 1e-6  # small value for safe division
         self.abduction_penalty = 0.5  # lambda for abduction
         self.confidence_threshold = 0.1
+        
+        # When False, rules skip building InferenceStep records and return
+        # None in their place
+        self.record_history = True
+        
+        # forward_chaining rule plan, reused while the atomspace is unchanged
+        self._fc_plan: Optional[List[Tuple[Atom, str, Atom]]] = None
+        self._fc_plan_key: Optional[Tuple[Any, int]] = None
+        # Deductions already applied by forward_chaining:
+        # (rule, link id, antecedent id) -> (link tv, antecedent tv, consequent tv)
+        # after the application. Truth values are immutable, so equal state
+        # means re-applying would derive and change nothing.
+        self._applied: Dict[Tuple[str, str, str], tuple] = {}
     
-    def deduction(self, implication: Atom, antecedent: Atom) -> Tuple[TruthValue, InferenceStep]:
+    def deduction(self, implication: Atom, antecedent: Atom) -> Tuple[TruthValue, Optional[InferenceStep]]:
         """
         Deduction: From A ⇒ B and A infer B
         Strength: sB = s1 * s2
@@ -46,29 +72,32 @@ class PLNReasoner:
         tv_impl = implication.tv
         tv_ante = antecedent.tv
         
-        # Calculate new truth value
+        # Calculate new truth value; products and noisy-OR of values in
+        # [0,1] stay in [0,1], so no clamping is needed
         s_result = tv_impl.s * tv_ante.s
         c_result = 1 - (1 - tv_impl.c) * (1 - tv_ante.c)
         
-        result_tv = TruthValue(s_result, c_result)
+        result_tv = TruthValue.unchecked(s_result, c_result)
+        if not self.record_history:
+            return result_tv, None
         
         # Create inference step record
         step = InferenceStep(
             rule="deduction",
-            premises=[
-                {"id": implication.id, "tv": tv_impl.to_dict()},
-                {"id": antecedent.id, "tv": tv_ante.to_dict()}
-            ],
-            conclusion={"id": f"deduction_result_{len(self.inference_history)}"},
+            premises=(
+                (implication.id, tv_impl.s, tv_impl.c),
+                (antecedent.id, tv_ante.s, tv_ante.c)
+            ),
+            conclusion={"id": f"deduction_result_{self._step_count}"},
             tv_in=None,
             tv_out=result_tv.to_dict(),
             notes="Deduction rule: sB = s1 * s2, cB = 1 - (1-c1)*(1-c2)"
         )
         
-        self.inference_history.append(step)
+        self._record(step)
         return result_tv, step
     
-    def induction(self, observations: List[Tuple[Atom, Atom]], sample_size: int = None) -> Tuple[TruthValue, InferenceStep]:
+    def induction(self, observations: List[Tuple[Atom, Atom]], sample_size: int = None) -> Tuple[TruthValue, Optional[InferenceStep]]:
         """
         Induction: From multiple observations of A & B, estimate P(B|A)
         Conservative confidence (≤0.6) as per simulated defaults
@@ -77,13 +106,9 @@ class PLNReasoner:
             raise ValueError("Need at least one observation for induction")
         
         # Count positive cases (both A and B are true with high strength)
-        positive_cases = 0
         total_cases = len(observations)
-        
-        for a_atom, b_atom in observations:
-            # Consider it a positive case if both have high strength
-            if a_atom.tv.s > 0.5 and b_atom.tv.s > 0.5:
-                positive_cases += 1
+        positive_cases = sum(1 for a_atom, b_atom in observations
+                             if a_atom.tv.s > 0.5 and b_atom.tv.s > 0.5)
         
         # Estimate strength as frequency
         s_result = positive_cases / total_cases if total_cases > 0 else 0.0
@@ -96,28 +121,26 @@ class PLNReasoner:
         c_result = min(0.6, math.sqrt(sample_size) / (math.sqrt(sample_size) + 10))
         
         result_tv = TruthValue(s_result, c_result)
+        if not self.record_history:
+            return result_tv, None
         
         # Create step record
-        premise_ids = []
-        for i, (a_atom, b_atom) in enumerate(observations):
-            premise_ids.extend([
-                {"id": a_atom.id, "tv": a_atom.tv.to_dict()},
-                {"id": b_atom.id, "tv": b_atom.tv.to_dict()}
-            ])
+        premise_ids = tuple((atom.id, atom.tv.s, atom.tv.c)
+                            for observation in observations for atom in observation)
         
         step = InferenceStep(
             rule="induction",
             premises=premise_ids,
-            conclusion={"id": f"induction_result_{len(self.inference_history)}"},
+            conclusion={"id": f"induction_result_{self._step_count}"},
             tv_in=None,
             tv_out=result_tv.to_dict(),
             notes=f"Induction from {total_cases} observations, {positive_cases} positive cases"
         )
         
-        self.inference_history.append(step)
+        self._record(step)
         return result_tv, step
     
-    def abduction(self, implication: Atom, consequent: Atom) -> Tuple[TruthValue, InferenceStep]:
+    def abduction(self, implication: Atom, consequent: Atom) -> Tuple[TruthValue, Optional[InferenceStep]]:
         """
         Abduction: From A ⇒ B and B infer A with penalty
         sA = s(B) * s(A⇒B) * λ, where λ is abduction penalty (default 0.5)
@@ -131,85 +154,151 @@ class PLNReasoner:
         c_result = 1 - (1 - tv_impl.c) * (1 - tv_cons.c)
         
         result_tv = TruthValue(s_result, c_result)
+        if not self.record_history:
+            return result_tv, None
         
         step = InferenceStep(
             rule="abduction",
-            premises=[
-                {"id": implication.id, "tv": tv_impl.to_dict()},
-                {"id": consequent.id, "tv": tv_cons.to_dict()}
-            ],
-            conclusion={"id": f"abduction_result_{len(self.inference_history)}"},
+            premises=(
+                (implication.id, tv_impl.s, tv_impl.c),
+                (consequent.id, tv_cons.s, tv_cons.c)
+            ),
+            conclusion={"id": f"abduction_result_{self._step_count}"},
             tv_in=None,
             tv_out=result_tv.to_dict(),
             notes=f"Abduction with penalty λ={self.abduction_penalty}"
         )
         
-        self.inference_history.append(step)
+        self._record(step)
         return result_tv, step
     
-    def revision(self, tv1: TruthValue, tv2: TruthValue, atom_id: str = None) -> Tuple[TruthValue, InferenceStep]:
+    def revision(self, tv1: TruthValue, tv2: TruthValue, atom_id: str = None) -> Tuple[TruthValue, Optional[InferenceStep]]:
         """
         Revision: Combine two independent STVs for same proposition
         s' = (w1*s1 + w2*s2) / (w1 + w2), where w = c / (1-c+ε)
         c' = 1 - (1-c1)*(1-c2)
         """
-        # Calculate weights from confidences
-        w1 = tv1.c / (1 - tv1.c + self.epsilon)
-        w2 = tv2.c / (1 - tv2.c + self.epsilon)
-        
-        # Weighted average of strengths
-        s_result = (w1 * tv1.s + w2 * tv2.s) / (w1 + w2) if (w1 + w2) > 0 else (tv1.s + tv2.s) / 2
+        s1, c1, s2, c2 = tv1.s, tv1.c, tv2.s, tv2.c
         
-        # Noisy-OR for confidence
-        c_result = 1 - (1 - tv1.c) * (1 - tv2.c)
+        # Calculate weights from confidences
+        w1 = c1 / (1 - c1 + self.epsilon)
+        w2 = c2 / (1 - c2 + self.epsilon)
         
-        result_tv = TruthValue(s_result, c_result)
+        # Weighted average of strengths and noisy-OR for confidence; both
+        # stay in [0,1], so no clamping is needed
+        total = w1 + w2
+        result_tv = TruthValue.unchecked(
+            (w1 * s1 + w2 * s2) / total if total > 0 else (s1 + s2) / 2,
+            1 - (1 - c1) * (1 - c2)
+        )
+        if not self.record_history:
+            return result_tv, None
         
         step = InferenceStep(
             rule="revision",
-            premises=[
-                {"id": atom_id or "evidence1", "tv": tv1.to_dict()},
-                {"id": atom_id or "evidence2", "tv": tv2.to_dict()}
-            ],
-            conclusion={"id": atom_id or f"revision_result_{len(self.inference_history)}"},
-            tv_in={"s": (tv1.s + tv2.s) / 2, "c": min(tv1.c, tv2.c)},  # avg of inputs as baseline
+            premises=(
+                (atom_id or "evidence1", s1, c1),
+                (atom_id or "evidence2", s2, c2)
+            ),
+            conclusion={"id": atom_id or f"revision_result_{self._step_count}"},
+            tv_in={"s": (s1 + s2) / 2, "c": min(c1, c2)},  # avg of inputs as baseline
             tv_out=result_tv.to_dict(),
             notes=f"Revision: weights w1={w1:.3f}, w2={w2:.3f}"
         )
         
-        self.inference_history.append(step)
+        self._record(step)
         return result_tv, step
     
     def backward_chaining(self, target: Atom, max_iterations: int = 100) -> Optional[TruthValue]:
         """
         Simple backward chaining to find evidence for target
         Returns the truth value if evidence is found
+        
+        Depth-first over the implications concluding each goal, using an
+        explicit stack. max_iterations bounds the chain length; subgoals
+        that failed with at least as much depth left are not searched again.
         """
         if not self.atomspace:
             return None
         
         # Look for direct evidence in atomspace
+        direct_tv = self._direct_evidence(target)
+        if direct_tv is not None or max_iterations <= 0:
+            return direct_tv
+        
+        rules_for = self._rules_by_consequent()
+        failed: Dict[Tuple[str, str], int] = {}  # (id, name) -> largest depth that failed
+        
+        # Frames are [goal, depth left, remaining candidate rules, rule being tried]
+        stack = [[target, max_iterations, iter(rules_for(target)), None]]
+        result = None  # outcome of the most recently finished frame
+        while stack:
+            frame = stack[-1]
+            goal, depth, candidates, trying = frame
+            
+            if trying is not None:
+                # A subgoal frame just finished
+                frame[3] = None
+                if result is not None:
+                    # Apply deduction
+                    result, _ = self.deduction(*trying)
+                    stack.pop()
+                    continue
+            
+            result = None
+            for atom, antecedent in candidates:
+                if failed.get((antecedent.id, antecedent.name), -1) >= depth - 1:
+                    continue
+                antecedent_tv = self._direct_evidence(antecedent)
+                if antecedent_tv is not None:
+                    result, _ = self.deduction(atom, antecedent)
+                    break
+                if depth - 1 > 0:
+                    # Try to prove the antecedent
+                    frame[3] = (atom, antecedent)
+                    stack.append([antecedent, depth - 1, iter(rules_for(antecedent)), None])
+                    break
+            
+            if frame[3] is None:
+                # Proved directly (result set) or ran out of candidates
+                if result is None:
+                    key = (goal.id, goal.name)
+                    failed[key] = max(failed.get(key, -1), depth)
+                stack.pop()
+        
+        return result
+    
+    def _direct_evidence(self, target: Atom) -> Optional[TruthValue]:
+        """Truth value of target if the atomspace holds it with enough confidence"""
         existing_atom = self.atomspace.get_atom(target.id)
         if existing_atom and existing_atom.tv.c > self.confidence_threshold:
             return existing_atom.tv
+        return None
+    
+    def _rules_by_consequent(self):
+        """
+        Index the implications in the atomspace by their consequent
         
-        # Look for implications that could lead to target
-        for atom in self.atomspace.atoms.values():
-            if isinstance(atom, (ImplicationLink, InheritanceLink)):
-                outgoing = self.atomspace.get_outgoing_atoms(atom)
-                if len(outgoing) == 2:
-                    antecedent, consequent = outgoing
-                    
-                    # Check if this implication concludes our target
-                    if consequent.id == target.id or consequent.name == target.name:
-                        # Try to prove the antecedent
-                        antecedent_tv = self.backward_chaining(antecedent, max_iterations - 1)
-                        if antecedent_tv and max_iterations > 0:
-                            # Apply deduction
-                            result_tv, _ = self.deduction(atom, antecedent)
-                            return result_tv
+        Returns a function giving, for a goal, the (implication, antecedent)
+        pairs whose consequent has the goal's id or name, in atomspace order.
+        """
+        rules = []
+        by_id: Dict[str, List[int]] = {}
+        by_name: Dict[str, List[int]] = {}
+        for atom in self.atomspace.iter_links(ImplicationLink, InheritanceLink):
+            outgoing = self.atomspace.get_outgoing_atoms(atom)
+            if len(outgoing) == 2:
+                antecedent, consequent = outgoing
+                by_id.setdefault(consequent.id, []).append(len(rules))
+                by_name.setdefault(consequent.name, []).append(len(rules))
+                rules.append((atom, antecedent))
         
-        return None
+        def rules_for(goal: Atom) -> List[Tuple[Atom, Atom]]:
+            positions = set(by_id.get(goal.id, ()))
+            positions.update(by_name.get(goal.name, ()))
+            return [rules[i] for i in sorted(positions)]
+        
+        return rules_for
     
     def forward_chaining(self, max_iterations: int = 10) -> List[Atom]:
         """
@@ -222,38 +311,47 @@ class PLNReasoner:
         derived_atoms = []
         iteration = 0
         
+        # Premises are re-read through the atom table each pass, since an
+        # update earlier in a pass feeds later deductions in the same pass.
+        rules = self._forward_chaining_plan()
+        
+        atoms = self.atomspace.atoms
+        applied = self._applied
         while iteration < max_iterations:
             new_derivations = False
             
             # Look for applicable deduction rules
-            for atom in list(self.atomspace.atoms.values()):
-                if isinstance(atom, (ImplicationLink, InheritanceLink)):
-                    outgoing = self.atomspace.get_outgoing_atoms(atom)
-                    if len(outgoing) == 2:
-                        antecedent, consequent = outgoing
+            for atom, antecedent_id, consequent in rules:
+                antecedent = atoms.get(antecedent_id)
+                
+                # Check if antecedent exists with sufficient confidence
+                if antecedent is not None and antecedent.tv.c > self.confidence_threshold:
+                    existing = atoms.get(consequent.id)
+                    key = ("deduction", atom.id, antecedent_id)
+                    if applied.get(key) == (atom.tv, antecedent.tv, existing.tv if existing else None):
+                        continue  # same premises and conclusion as last time
+                    
+                    # Derive consequent
+                    new_tv, step = self.deduction(atom, antecedent)
+                    
+                    # Check if this is a new or improved conclusion
+                    if not existing or new_tv.c > existing.tv.c:
+                        # Create or update the consequent atom
+                        if existing:
+                            existing.tv = new_tv
+                        else:
+                            existing = Atom(
+                                id=consequent.id,
+                                name=consequent.name,
+                                subtype=consequent.subtype,
+                                tv=new_tv
+                            )
+                            self.atomspace.add_atom(existing)
+                            derived_atoms.append(existing)
                         
-                        # Check if antecedent exists with sufficient confidence
-                        if antecedent.tv.c > self.confidence_threshold:
-                            # Derive consequent
-                            new_tv, step = self.deduction(atom, antecedent)
-                            
-                            # Check if this is a new or improved conclusion
-                            existing = self.atomspace.get_atom(consequent.id)
-                            if not existing or new_tv.c > existing.tv.c:
-                                # Create or update the consequent atom
-                                if existing:
-                                    existing.tv = new_tv
-                                else:
-                                    new_atom = Atom(
-                                        id=consequent.id,
-                                        name=consequent.name,
-                                        subtype=consequent.subtype,
-                                        tv=new_tv
-                                    )
-                                    self.atomspace.add_atom(new_atom)
-                                    derived_atoms.append(new_atom)
-                                
-                                new_derivations = True
+                        new_derivations = True
+                    
+                    applied[key] = (atom.tv, antecedent.tv, existing.tv)
             
             if not new_derivations:
                 break
@@ -262,6 +360,29 @@ class PLNReasoner:
         
         return derived_atoms
     
+    def _forward_chaining_plan(self) -> List[Tuple[Atom, str, Atom]]:
+        """
+        Applicable deduction rules as (link, antecedent id, consequent).
+        Built once and reused until the atomspace is modified; chaining
+        itself only updates truth values, so repeated calls share a plan.
+        """
+        key = (self.atomspace, self.atomspace._version)
+        if self._fc_plan is None or self._fc_plan_key != key:
+            rules = []
+            for atom in self.atomspace.iter_links(ImplicationLink, InheritanceLink):
+                outgoing = self.atomspace.get_outgoing_atoms(atom)
+                if len(outgoing) == 2:
+                    rules.append((atom, outgoing[0].id, outgoing[1]))
+            self._fc_plan = rules
+            self._fc_plan_key = key
+            self._applied.clear()
+        return self._fc_plan
+    
+    def _record(self, step: InferenceStep):
+        """Append step to the inference history"""
+        self.inference_history.append(step)
+        self._step_count += 1
+    
     def get_inference_trace(self) -> List[Dict[str, Any]]:
         """Get the complete inference trace as list of dicts"""
         return [step.to_dict() for step in self.inference_history]
@@ -269,6 +390,7 @@ class PLNReasoner:
     def clear_history(self):
         """Clear inference history"""
         self.inference_history.clear()
+        self._step_count = 0
     
     def print_trace(self):
         """Print human-readable inference trace"""
@@ -276,9 +398,8 @@ class PLNReasoner:
         for i, step in enumerate(self.inference_history):
             print(f"\nStep {i+1}: {step.rule.upper()}")
             print(f"  Premises: {len(step.premises)} atoms")
-            for premise in step.premises:
-                tv = premise.get('tv', {})
-                print(f"    {premise['id']}: s={tv.get('s', 0):.3f}, c={tv.get('c', 0):.3f}")
+            for atom_id, s, c in step.premises:
+                print(f"    {atom_id}: s={s:.3f}, c={c:.3f}")
             
             tv_out = step.tv_out
             print(f"  Result: s={tv_out['s']:.3f}, c={tv_out['c']:.3f}")
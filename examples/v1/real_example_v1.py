@@ -11,7 +11,8 @@ This example demonstrates all the v1 model implementations working together:
 Based on the v1 cards, schemas, and playbooks.
 """
 
-import json
+import functools
+import math
 import random
 from typing import List, Dict, Any
 
@@ -19,10 +20,11 @@ from typing import List, Dict, Any
 from models.atomspace import (
     AtomSpace, ConceptNode, PredicateNode, NumberNode,
     InheritanceLink, ImplicationLink, EvaluationLink, ListLink,
-    TruthValue, AttentionValue
+    TruthValue, AttentionValue, _dump_json
 )
 from models.pln import PLNReasoner
-from models.moses import Program, Expression, ExprKind, MOSESEvolver, accuracy_fitness
+from models.moses import (Program, Expression, ExprKind, MOSESEvolver, TrainingData,
+                          accuracy_fitness, column_mean_error)
 from models.pattern_mining import PatternMiner
 
 
@@ -95,30 +97,21 @@ def create_knowledge_base() -> AtomSpace:
     return atomspace
 
 
-def demonstrate_pln_reasoning(atomspace: AtomSpace):
+def demonstrate_pln_reasoning(reasoner: PLNReasoner):
     """Demonstrate PLN reasoning capabilities"""
     print("=== PLN Reasoning Demonstration ===")
     
-    reasoner = PLNReasoner(atomspace)
+    atomspace = reasoner.atomspace
     
     # Get some atoms for reasoning
-    cat = atomspace.get_atoms_by_name("Cat")[0]
-    dog = atomspace.get_atoms_by_name("Dog")[0]
-    mammal = atomspace.get_atoms_by_name("Mammal")[0]
-    animal = atomspace.get_atoms_by_name("Animal")[0]
+    cat = atomspace.get_atom_by_name("Cat")
+    dog = atomspace.get_atom_by_name("Dog")
+    mammal = atomspace.get_atom_by_name("Mammal")
+    animal = atomspace.get_atom_by_name("Animal")
     
     # Find inheritance links
-    cat_mammal = None
-    mammal_animal = None
-    
-    for atom in atomspace.atoms.values():
-        if isinstance(atom, InheritanceLink):
-            outgoing = atomspace.get_outgoing_atoms(atom)
-            if len(outgoing) == 2:
-                if outgoing[0].name == "Cat" and outgoing[1].name == "Mammal":
-                    cat_mammal = atom
-                elif outgoing[0].name == "Mammal" and outgoing[1].name == "Animal":
-                    mammal_animal = atom
+    cat_mammal = atomspace.find_link(InheritanceLink, "Cat", "Mammal")
+    mammal_animal = atomspace.find_link(InheritanceLink, "Mammal", "Animal")
     
     # 1. Deduction: Cat -> Mammal, Mammal -> Animal, therefore Cat -> Animal
     if cat_mammal and mammal_animal:
@@ -164,6 +157,54 @@ def demonstrate_pln_reasoning(atomspace: AtomSpace):
     reasoner.print_trace()
 
 
+def regression_fitness(program: Program, data: List[Dict[str, Any]], target_key: str,
+                       max_error: float = None) -> float:
+    """
+    Fitness function for regression
+    
+    Candidates whose mean error would exceed max_error are cut off early
+    and score 0.0.
+    """
+    if isinstance(data, TrainingData) and data.target_key == target_key:
+        # Evaluate a whole column at once, sharing subtrees across programs
+        if not data.targets:
+            return 0.0
+        avg_error = column_mean_error(data.evaluator.evaluate(program.expression), data.targets,
+                                      max_error=max_error)
+    else:
+        if not data:
+            return 0.0
+        evaluate = program.compile()
+        limit = max_error * len(data) if max_error is not None else math.inf
+        total_error = 0.0
+        
+        for point in data:
+            actual = point.get(target_key)
+            if actual is None:
+                # No target to compare against: penalize without evaluating
+                total_error += 100
+            else:
+                try:
+                    total_error += abs(evaluate(point) - actual)
+                except Exception:
+                    # Penalize programs that crash
+                    total_error += 100
+            if total_error > limit:
+                return 0.0
+        
+        avg_error = total_error / len(data)
+    
+    # Convert to fitness (higher is better)
+    fitness = 1.0 / (1.0 + avg_error)
+    return fitness
+
+
+# Candidates worse on average than crashing on every point are not worth
+# finishing. Bound once at module level so it pickles to worker processes
+# and repeated runs share one fitness cache entry.
+capped_regression_fitness = functools.partial(regression_fitness, max_error=100.0)
+
+
 def demonstrate_moses_evolution():
     """Demonstrate MOSES program evolution"""
     print("\n=== MOSES Program Evolution Demonstration ===")
@@ -181,37 +222,17 @@ def demonstrate_moses_evolution():
     # Set up MOSES evolver
     variables = ["x"]
     
-    def regression_fitness(program: Program, data: List[Dict[str, Any]], target_key: str) -> float:
-        """Fitness function for regression"""
-        total_error = 0.0
-        valid_predictions = 0
-        
-        for point in data:
-            try:
-                predicted = program.evaluate(point)
-                actual = point[target_key]
-                error = abs(predicted - actual)
-                total_error += error
-                valid_predictions += 1
-            except:
-                # Penalize programs that crash
-                total_error += 100
-                valid_predictions += 1
-        
-        if valid_predictions == 0:
-            return 0.0
-        
-        avg_error = total_error / valid_predictions
-        # Convert to fitness (higher is better)
-        fitness = 1.0 / (1.0 + avg_error)
-        return fitness
+    # Resolve rows and targets once, up front, rather than inside evolve()
+    training_data = TrainingData(training_data, variables, "target")
     
     evolver = MOSESEvolver(
         variables=variables,
-        fitness_function=regression_fitness,
+        fitness_function=capped_regression_fitness,
         population_size=30,
         generations=20,
-        mutation_rate=0.2
+        mutation_rate=0.2,
+        max_workers=None,  # score candidates on every core
+        surrogate_neighbors=3  # skip offspring that resemble poor programs
     )
     
     print("\nEvolving programs...")
@@ -252,30 +273,22 @@ def demonstrate_pattern_mining(atomspace: AtomSpace):
     return patterns
 
 
-def demonstrate_belief_network_pln(atomspace: AtomSpace):
+def demonstrate_belief_network_pln(reasoner: PLNReasoner):
     """Demonstrate PLN on belief network as per playbooks/pln_on_belief_network.md"""
     print("\n=== PLN on Belief Network (Playbook Demo) ===")
     
-    reasoner = PLNReasoner(atomspace)
+    atomspace = reasoner.atomspace
     
     print("1. Selecting premises for reasoning...")
     
-    # Find implication links for reasoning
-    implications = []
-    for atom in atomspace.atoms.values():
-        if isinstance(atom, (ImplicationLink, InheritanceLink)):
-            implications.append(atom)
+    # Count implication links for reasoning
+    implication_count = atomspace.count_links(ImplicationLink, InheritanceLink)
     
-    print(f"   Found {len(implications)} implications/inheritances")
+    print(f"   Found {implication_count} implications/inheritances")
     
     print("2. Normalizing STVs...")
-    normalized_count = 0
-    for atom in atomspace.atoms.values():
-        # Ensure truth values are in [0,1]
-        if atom.tv.s < 0 or atom.tv.s > 1 or atom.tv.c < 0 or atom.tv.c > 1:
-            atom.tv.s = max(0, min(1, atom.tv.s))
-            atom.tv.c = max(0, min(1, atom.tv.c))
-            normalized_count += 1
+    # Ensure truth values are in [0,1]
+    normalized_count = atomspace.normalize_truth_values()
     
     print(f"   Normalized {normalized_count} truth values")
     
@@ -296,15 +309,11 @@ def demonstrate_belief_network_pln(atomspace: AtomSpace):
     print("5. Updating attention values...")
     # Increase STI for atoms touched during inference
     touched_atoms = set()
-    for step in trace:
-        for premise in step['premises']:
-            touched_atoms.add(premise['id'])
-        touched_atoms.add(step['conclusion']['id'])
+    for step in reasoner.inference_history:
+        touched_atoms.update(atom_id for atom_id, _, _ in step.premises)
+        touched_atoms.add(step.conclusion['id'])
     
-    for atom_id in touched_atoms:
-        atom = atomspace.get_atom(atom_id)
-        if atom:
-            atom.av.sti = min(1.0, atom.av.sti + 0.1)
+    atomspace.stimulate(touched_atoms, 0.1)
     
     print(f"   Updated attention for {len(touched_atoms)} atoms")
     
@@ -335,10 +344,12 @@ def save_example_results(atomspace: AtomSpace, patterns: List, filename: str = "
         }
     }
     
-    with open(filename, 'w') as f:
-        json.dump(results, f, indent=2)
+    # Serialize once (compact, orjson when available) and report the bytes written
+    payload = _dump_json(results)
+    with open(filename, 'wb') as f:
+        f.write(payload)
     
-    print(f"Results saved! File size: {len(json.dumps(results))} characters")
+    print(f"Results saved! File size: {len(payload)} bytes")
 
 
 def main():
@@ -354,13 +365,17 @@ def main():
     atomspace = create_knowledge_base()
     print(f"Created AtomSpace with {len(atomspace)} atoms")
     
+    # One reasoner for every PLN stage, so its rule plan, applied-deduction
+    # memo and inference trace carry over between them
+    reasoner = PLNReasoner(atomspace)
+    
     # Show some examples
     print("\nSample atoms:")
     for i, atom in enumerate(list(atomspace.atoms.values())[:5]):
         print(f"  {atom}")
     
     # 2. PLN Reasoning
-    demonstrate_pln_reasoning(atomspace)
+    demonstrate_pln_reasoning(reasoner)
     
     # 3. MOSES Evolution
     demonstrate_moses_evolution()
@@ -369,7 +384,7 @@ def main():
     patterns = demonstrate_pattern_mining(atomspace)
     
     # 5. Belief Network PLN (following playbook)
-    demonstrate_belief_network_pln(atomspace)
+    demonstrate_belief_network_pln(reasoner)
     
     # 6. Save results
     save_example_results(atomspace, patterns)
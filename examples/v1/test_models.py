@@ -13,7 +13,7 @@ def test_atomspace():
     print("Testing AtomSpace...")
     
     try:
-        from models.atomspace import AtomSpace, ConceptNode, InheritanceLink, TruthValue
+        from models.atomspace import AtomSpace, ConceptNode, InheritanceLink, Link, TruthValue
         
         # Create atomspace
         atomspace = AtomSpace()
@@ -32,12 +32,99 @@ def test_atomspace():
         # Test queries
         assert len(atomspace) == 3
         assert len(atomspace.get_atoms_by_name("Cat")) == 1
+        assert atomspace.get_atom_by_name("Cat") is cat
+        assert atomspace.get_atom_by_name("Dog") is None
+        assert atomspace.get_incoming_atoms(cat) == [inheritance]
+        assert atomspace.get_incoming_atoms(inheritance) == []
+        assert list(atomspace.links.values()) == [inheritance]
+        assert list(atomspace.iter_links(InheritanceLink)) == [inheritance]
+        assert atomspace.count_links(InheritanceLink) == atomspace.count_links(Link) == 1
+        assert atomspace.find_link(InheritanceLink, "Cat", "Mammal") is inheritance
+        assert atomspace.find_link(InheritanceLink, "Mammal", "Cat") is None
+
+        # Test removal keeps indexes consistent
+        assert atomspace.remove_atom(inheritance)
+        assert atomspace.get_incoming_atoms(cat) == []
+        assert not atomspace.links
+        assert not atomspace.remove_atom(inheritance)
+        assert atomspace.find_link(InheritanceLink, "Cat", "Mammal") is None
+        atomspace.add_atom(inheritance)
+
+        # Re-adding an atom must not duplicate index entries
+        atomspace.add_atom(cat)
+        assert len(atomspace.get_atoms_by_name("Cat")) == 1
+        assert len(atomspace.get_atoms_by_type("ConceptNode", "ConceptNode")) == 2
+        
+        # The find_link index follows adds without a rebuild, including
+        # links added before their endpoints
+        linked = AtomSpace()
+        linked.add_atom(cat)
+        assert linked.find_link(InheritanceLink, "Cat", "Mammal") is None
+        linked.add_atom(inheritance)
+        assert linked.find_link(InheritanceLink, "Cat", "Mammal") is None
+        linked.add_atom(mammal)
+        assert linked.find_link(InheritanceLink, "Cat", "Mammal") is inheritance
+        index = linked._by_type_endpoints
+        newer = linked.add_atom(InheritanceLink(cat, mammal))
+        assert linked.find_link(InheritanceLink, "Cat", "Mammal") is newer
+        assert linked._by_type_endpoints is index
+        linked.remove_atom(newer)
+        assert linked.find_link(InheritanceLink, "Cat", "Mammal") is inheritance
+
+        # Truth values are clamped unless built through the unchecked path
+        clamped = TruthValue(1.5, -0.2)
+        assert (clamped.s, clamped.c) == (1.0, 0.0)
+        assert TruthValue.unchecked(0.3, 0.4) == TruthValue(0.3, 0.4)
+        mammal.tv = TruthValue.unchecked(1.2, 0.5)
+        assert atomspace.normalize_truth_values() == 1
+        assert mammal.tv == TruthValue(1.0, 0.5)
+        assert atomspace.normalize_truth_values() == 0
+        
+        # Explicit numeric ids are never handed out again
+        explicit = ConceptNode("Explicit", id="1000000")
+        assert explicit.id == "n:1000000"
+        assert int(ConceptNode("Automatic").id[2:]) > 1000000
+        
+        # Loaded values are clamped, since saved files are not trusted
+        loaded = AtomSpace()
+        loaded.from_dict({"atoms": [{"type": "Node", "subtype": "ConceptNode", "id": "n:loaded",
+                                     "name": "Loaded", "tv": {"s": 1.5, "c": -0.5},
+                                     "av": {"sti": 2.0, "lti": -1.0}}]})
+        loaded_atom = loaded.atoms["n:loaded"]
+        assert loaded_atom.tv == TruthValue(1.0, 0.0)
+        assert (loaded_atom.av.sti, loaded_atom.av.lti) == (1.0, 0.0)
+        
+        # Test bulk attention updates skip unknown ids and cap STI
+        assert atomspace.stimulate([cat.id, "missing"], 0.7) == 1
+        assert atomspace.stimulate([cat.id], 0.7) == 1
+        assert cat.av.sti == 1.0
         
         # Test serialization
         data = atomspace.to_dict()
         assert "atoms" in data
         assert len(data["atoms"]) == 3
         
+        # Atom dicts follow changes to the atom, and callers get fresh
+        # dicts they can modify
+        first = cat.to_dict()
+        assert first == cat.to_dict() and first is not cat.to_dict()
+        first["name"] = "Dog"
+        first["av"]["sti"] = 0.9
+        first["tv"]["s"] = 0.1
+        assert cat.to_dict()["name"] == "Cat" and cat.to_dict()["av"]["sti"] != 0.9
+        assert cat.to_dict()["tv"]["s"] == cat.tv.s != 0.1
+        cat.av.sti = 0.25
+        assert cat.to_dict()["av"]["sti"] == 0.25
+        cat.subtype = "AnimalNode"
+        assert cat.to_dict()["subtype"] == "AnimalNode"
+        cat.subtype = "ConceptNode"
+        cat.meta = {"source": "a"}
+        assert cat.to_dict()["meta"] == {"source": "a"}
+        cat.meta = {"source": "b"}
+        assert cat.to_dict()["meta"] == {"source": "b"}
+        cat.meta = {}
+        assert inheritance.to_dict()["out"] == [cat.id, mammal.id]
+        
         print("  ✓ AtomSpace tests passed")
         return True
         
@@ -81,12 +168,46 @@ def test_pln():
         assert 0 <= result_tv.s <= 1
         assert step.rule == "induction"
         
+        # Test backward chaining through a cycle of implications
+        animal = ConceptNode("Animal", tv=TruthValue(0.5, 0.0))
+        atomspace.add_atom(animal)
+        atomspace.add_atom(InheritanceLink(mammal, animal, tv=TruthValue(0.95, 0.9)))
+        atomspace.add_atom(InheritanceLink(animal, mammal, tv=TruthValue(0.5, 0.5)))
+        result_tv = reasoner.backward_chaining(animal)
+        assert result_tv is not None
+        assert abs(result_tv.s - 0.95 * 0.95) < 1e-9
+
+        # Test forward chaining reuses its rule plan until the atomspace changes
+        reasoner.forward_chaining(max_iterations=1)
+        plan = reasoner._fc_plan
+        reasoner.forward_chaining(max_iterations=1)
+        assert reasoner._fc_plan is plan
+        atomspace.add_atom(InheritanceLink(cat, animal, tv=TruthValue(0.8, 0.7)))
+        reasoner.forward_chaining(max_iterations=1)
+        assert len(reasoner._fc_plan) == len(plan) + 1
+        
+        # Test forward chaining does not repeat deductions over unchanged premises
+        chain = AtomSpace()
+        for atom in (cat, mammal, inheritance):
+            chain.add_atom(atom)
+        chain_reasoner = PLNReasoner(chain)
+        chain_reasoner.forward_chaining()
+        chain_reasoner.forward_chaining()
+        assert len(chain_reasoner.inference_history) == 1
+
         # Test revision
         tv1 = TruthValue(0.7, 0.6)
         tv2 = TruthValue(0.8, 0.5)
         result_tv, step = reasoner.revision(tv1, tv2)
         assert step.rule == "revision"
         
+        # Rules still compute results with history recording switched off
+        reasoner.record_history = False
+        history_size = len(reasoner.inference_history)
+        unrecorded_tv, step = reasoner.revision(tv1, tv2)
+        assert step is None and unrecorded_tv == result_tv
+        assert len(reasoner.inference_history) == history_size
+        
         print("  ✓ PLN Reasoner tests passed")
         return True
         
@@ -101,7 +222,10 @@ def test_moses():
     print("Testing MOSES...")
     
     try:
-        from models.moses import Expression, Program, ExprKind, ProgramGenerator
+        import random
+        from models import moses
+        from models.moses import (Expression, Program, ExprKind, ProgramGenerator,
+                                  MOSESEvolver, TrainingData, accuracy_fitness)
         
         # Test expression creation
         const_expr = Expression(kind=ExprKind.CONST, value=5)
@@ -123,21 +247,132 @@ def test_moses():
         
         result = add_expr.evaluate({"x": 3})
         assert result == 8  # 5 + 3
+        assert add_expr.compile()({"x": 3}) == 8
+        assert add_expr.compile_source()({"x": 3}) == 8
+        assert add_expr.compile_source({"x": 0})((3,)) == 8
+        
+        # Test constant-only subtrees are folded once
+        const_sum = Expression(kind=ExprKind.OP, op="*", args=[
+            const_expr, Expression(kind=ExprKind.CONST, value=2)])
+        assert const_sum.folded_value() == (10,)
+        assert add_expr.folded_value() == ()
         
         # Test program
         program = Program(add_expr)
         result = program.evaluate({"x": 2})
         assert result == 7  # 5 + 2
         
+        # Program ids do not draw from the shared random state
+        state = random.getstate()
+        assert Program(add_expr).id != Program(add_expr).id
+        assert random.getstate() == state
+        
+        # Memoized results keep 1.0 and True apart
+        identity = Program(var_expr)
+        assert identity.evaluate({"x": 1.0}) == 1.0
+        assert identity.evaluate({"x": True}) is True
+        
+        # Structural ids stay unique when the id table is cleared
+        table_size = moses._STRUCTURAL_IDS_MAXSIZE
+        moses._STRUCTURAL_IDS_MAXSIZE = 1
+        try:
+            ids = {Expression(kind=ExprKind.CONST, value=v).structural_id for v in (101, 102, 103)}
+        finally:
+            moses._STRUCTURAL_IDS_MAXSIZE = table_size
+        assert len(ids) == 3
+        
+        # Test fitness on regression and classification targets
+        regression_data = [{"x": x, "y": x + 5} for x in range(4)]
+        assert accuracy_fitness(program, regression_data, "y") == 1.0
+        is_positive = Program(Expression(kind=ExprKind.OP, op=">", args=[
+            var_expr, Expression(kind=ExprKind.CONST, value=0)]))
+        classification_data = [{"x": x, "pos": x > 1} for x in range(4)]
+        assert accuracy_fitness(is_positive, classification_data, "pos") == 0.75
+        bound_data = TrainingData(classification_data, ["x"], "pos")
+        assert bound_data.rows[2] == (2,)
+        assert accuracy_fitness(is_positive, bound_data, "pos") == 0.75
+        data_keys = {TrainingData([{"x": i, "pos": True}], ["x"], "pos").data_key
+                     for i in range(moses._DATA_KEYS_MAXSIZE + 5)}
+        assert len(data_keys) == moses._DATA_KEYS_MAXSIZE + 5
+        assert len(moses._DATA_KEYS) == moses._DATA_KEYS_MAXSIZE
+        assert moses.column_mean_error([1, 2, 3], [1, 1, 1]) == 1.0
+        assert moses.column_mean_error([1, 2], [1, None]) == 50.0
+        assert moses.column_mean_error([1, 9, 3], [1, 1, 1], max_error=2.0) == float("inf")
+        
         # Test serialization
         data = program.to_dict()
         assert data["type"] == "Program"
+        data["out"]["kind"] = "const"
+        assert program.to_dict()["out"]["kind"] != "const"
+        
+        # Test cloning produces an independent, equal tree
+        clone = add_expr.clone()
+        assert clone.to_dict() == add_expr.to_dict()
+        assert clone.args[0] is not add_expr.args[0]
+        assert add_expr.size == clone.size == 3
         
         # Test program generator
         generator = ProgramGenerator(["x", "y"])
         program = generator.generate_program()
         assert program.expression is not None
-        
+
+        # Test scoring in worker processes matches in-process scoring
+        results = []
+        for workers in (1, 2):
+            moses._FITNESS_CACHE.clear()
+            random.seed(3)
+            evolver = MOSESEvolver(["x"], accuracy_fitness, population_size=20,
+                                   generations=3, max_workers=workers)
+            results.append([(str(p.expression), p.fitness)
+                            for p in evolver.evolve(classification_data, "pos")])
+        assert results[0] == results[1]
+        
+        # Test runs with their own seeded generator are reproducible
+        seeded = [[str(p.expression) for p in MOSESEvolver(
+                      ["x"], accuracy_fitness, population_size=10, generations=2,
+                      rng=random.Random(11)).evolve(classification_data, "pos")]
+                  for _ in range(2)]
+        assert seeded[0] == seeded[1]
+
+        # Test a repeated run on equal data reuses the earlier scores
+        calls = []
+        def counting_fitness(program, data, target_key):
+            calls.append(program)
+            return accuracy_fitness(program, data, target_key)
+        random.seed(3)
+        MOSESEvolver(["x"], counting_fitness, population_size=20,
+                     generations=3).evolve(classification_data, "pos")
+        first_run_calls = len(calls)
+        random.seed(3)
+        MOSESEvolver(["x"], counting_fitness, population_size=20,
+                     generations=3).evolve(list(classification_data), "pos")
+        assert len(calls) == first_run_calls > 0
+        
+        # Test scores are not shared between data differing in other columns
+        def weighted_fitness(program, data, target_key):
+            return accuracy_fitness(program, data, target_key) * data[0]["w"]
+        fitness = []
+        for weight in (1.0, 0.0):
+            weighted_data = [dict(point, w=weight) for point in classification_data]
+            random.seed(3)
+            fitness.append([p.fitness for p in MOSESEvolver(
+                ["x"], weighted_fitness, population_size=10,
+                generations=2).evolve(weighted_data, "pos")])
+        assert max(fitness[0]) > 0 and fitness[1] == [0.0] * len(fitness[1])
+
+        # Test the surrogate skips clearly-low candidates but keeps true scores on top
+        surrogate = MOSESEvolver(["x"], accuracy_fitness, population_size=20, generations=3,
+                                 rng=random.Random(5), surrogate_neighbors=3,
+                                 surrogate_threshold=0.9)
+        top = surrogate.evolve(regression_data, "y")[0]
+        assert top.fitness == accuracy_fitness(top, regression_data, "y")
+        negative = MOSESEvolver(["x"], lambda p, d, k: accuracy_fitness(p, d, k) - 1.0,
+                                population_size=20, generations=3, rng=random.Random(5),
+                                surrogate_neighbors=3)
+        returned = negative.evolve(regression_data, "y")
+        assert not any(p.fitness_estimated for p in returned + negative.best_programs)
+        assert moses.expression_features(add_expr)[:2] == (1, 1)
+
         print("  ✓ MOSES tests passed")
         return True
         
@@ -182,6 +417,11 @@ def test_pattern_mining():
             assert 0 <= pattern.confidence <= 1
             assert len(pattern.atoms) > 0
         
+        # Lifts too large for a float are infinite instead of raising
+        from models.pattern_mining import SubgraphPattern
+        huge = SubgraphPattern("p:huge", [ConceptNode(f"H{i}") for i in range(400)], support=5)
+        assert miner._calculate_lift(huge) == float("inf")
+        
         print("  ✓ Pattern Mining tests passed")
         return True
         
@@ -0,0 +1,88 @@
+"""
+Shared line handling for the CogPrime text-to-Markdown converters.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Numbered list items ("1. ", "2. ", ...), compiled once at import
+NUMLIST_RE = re.compile(r'^\d+\.\s')
+
+# Bullet character in the extracted PDF text
+BULLET_PREFIX = '•'
+
+def is_section_number(line, depth):
+    """True for dotted section numbers with depth parts, like "1.2" for depth 2"""
+    parts = line.split('.')
+    return len(parts) == depth and all(part.isdecimal() for part in parts)
+
+def read_stripped_lines(path):
+    """
+    Lines of a text file, stripped once as they are read
+    
+    Matches [l.strip() for l in content.split('\\n')]: a trailing newline
+    yields a final empty line.
+    """
+    lines = []
+    ends_with_newline = True
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            ends_with_newline = line.endswith('\n')
+            lines.append(line.strip())
+    if ends_with_newline:
+        lines.append('')
+    return lines
+
+def collapse_blank_lines(lines):
+    """Yield lines, dropping empty lines that directly follow another empty line."""
+    prev_empty = False
+    for line in lines:
+        if line == "":
+            if prev_empty:
+                continue
+            prev_empty = True
+        else:
+            prev_empty = False
+        yield line
+
+def clean_lines(lines):
+    """Yield stripped lines, removing page numbers and isolated numbers"""
+    for line in lines:
+        line = line.strip()
+        length = len(line)
+        # Most lines are long prose: only short ones need the checks below
+        if length <= 3:
+            # Skip empty lines and standalone numbers that are likely page numbers
+            if length == 0 or line.isdigit():
+                continue
+            # Skip very short lines that don't start with a capital letter (likely formatting artifacts)
+            if length < 3 and not line.isupper():
+                continue
+        yield line
+
+def batch_convert(convert, paths, max_workers=None):
+    """
+    Convert each input file to a .md file next to it, in parallel processes
+    
+    convert(input_file, output_file) must be a module-level function so it
+    can be sent to the worker processes. A single file is converted in
+    this process. Inputs that are already .md files are skipped rather than
+    overwritten. Returns the output paths that were written.
+    """
+    inputs = []
+    outputs = []
+    for path in paths:
+        output = Path(path).with_suffix('.md')
+        if output.resolve() == Path(path).resolve():
+            print(f"Skipping {path}: output would overwrite the input")
+            continue
+        inputs.append(str(path))
+        outputs.append(str(output))
+    if len(inputs) <= 1 or max_workers == 1:
+        for input_file, output_file in zip(inputs, outputs):
+            convert(input_file, output_file)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(convert, inputs, outputs))
+    return outputs
@@ -3,32 +3,29 @@
 Clean conversion of CogPrime PDF to Markdown with proper structure.
 """
 
-import re
-
-def create_clean_markdown(input_file, output_file):
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Clean up the content to remove formatting artifacts
-    lines = content.split('\n')
-    
-    # Remove page numbers and isolated numbers
-    cleaned_lines = []
-    for line in lines:
-        line = line.strip()
-        # Skip standalone numbers that are likely page numbers
-        if line.isdigit() and len(line) <= 3:
-            continue
-        # Skip very short lines that don't start with a capital letter (likely formatting artifacts)
-        if len(line) < 3 and not line.isupper():
-            continue
-        cleaned_lines.append(line)
-    
-    # Reconstruct content
-    clean_content = '\n'.join(cleaned_lines)
-    
-    # Manual structure based on content analysis
-    markdown_content = """# CogPrime: An Integrative Architecture for Embodied Artificial General Intelligence
+from _md_utils import clean_lines
+
+# Section outline based on our analysis, rendered once as a Markdown list
+_SECTIONS = (
+    "1.3 What Kind of 'Intelligence' is CogPrime Aimed At?",
+    "1.4 Key Claims", 
+    "2. CogPrime and OpenCog",
+    "2.1 Current and Prior Applications of OpenCog",
+    "2.2 Transitioning from Virtual Agents to a Physical Robot",
+    "3. Philosophical Background",
+    "4. High-Level Architecture of CogPrime", 
+    "5. Local and Global Knowledge Representation",
+    "6. Memory Types and Associated Cognitive Processes in CogPrime",
+    "7. Goal-Oriented Dynamics in CogPrime",
+    "8. Clarifying the Key Claims",
+    "9. Measuring Incremental Progress Toward Human-Level AGI",
+    "10. A CogPrime Thought Experiment: Build Me Something I",
+    "11. Broader Issues"
+)
+_SECTION_OUTLINE = "".join(f"- {section}\n" for section in _SECTIONS)
+
+# Manual structure based on content analysis
+_STATIC_PREAMBLE = """# CogPrime: An Integrative Architecture for Embodied Artificial General Intelligence
 
 **Ben Goertzel**
 
@@ -70,41 +67,29 @@ The human brain appears to be an integration of an assemblage of diverse structu
 
 """
 
-    # For now, let's use this manual content for the first sections
-    # In a real implementation, we would parse the rest of the content similarly
-    
-    # Write the partial markdown content
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
-        
-        # Add the rest of the content with basic formatting
-        f.write("\n---\n\n**Note: This is a partial conversion. The complete document contains many more sections including:**\n\n")
-        
-        # Add section outline based on our analysis
-        sections = [
-            "1.3 What Kind of 'Intelligence' is CogPrime Aimed At?",
-            "1.4 Key Claims", 
-            "2. CogPrime and OpenCog",
-            "2.1 Current and Prior Applications of OpenCog",
-            "2.2 Transitioning from Virtual Agents to a Physical Robot",
-            "3. Philosophical Background",
-            "4. High-Level Architecture of CogPrime", 
-            "5. Local and Global Knowledge Representation",
-            "6. Memory Types and Associated Cognitive Processes in CogPrime",
-            "7. Goal-Oriented Dynamics in CogPrime",
-            "8. Clarifying the Key Claims",
-            "9. Measuring Incremental Progress Toward Human-Level AGI",
-            "10. A CogPrime Thought Experiment: Build Me Something I",
-            "11. Broader Issues"
-        ]
-        
-        for section in sections:
-            f.write(f"- {section}\n")
-        
-        f.write(f"\n**Full document content follows below (auto-converted from PDF):**\n\n---\n\n")
-        
-        # Add the cleaned content
-        f.write(clean_content)
+# Everything written ahead of the converted content: the partial markdown
+# and the outline, assembled once at import
+_HEADER = "".join([
+    _STATIC_PREAMBLE,
+    "\n---\n\n**Note: This is a partial conversion. The complete document contains many more sections including:**\n\n",
+    _SECTION_OUTLINE,
+    "\n**Full document content follows below (auto-converted from PDF):**\n\n---\n\n",
+])
+
+def create_clean_markdown(input_file, output_file):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        with open(output_file, 'w', encoding='utf-8') as out:
+            # For now, let's use the manual content for the first sections
+            # In a real implementation, we would parse the rest of the content similarly
+            out.write(_HEADER)
+            
+            # Add the rest of the content with basic formatting, streamed from the
+            # input one cleaned line at a time (newline-separated, none at the end)
+            cleaned = clean_lines(f)
+            first = next(cleaned, None)
+            if first is not None:
+                out.write(first)
+                out.writelines('\n' + line for line in cleaned)
     
     print(f"Created structured markdown file: {output_file}")
 
@@ -4,16 +4,14 @@ Manually convert CogPrime_Overview_Paper.txt to properly formatted Markdown.
 Based on analysis of the actual document structure.
 """
 
-import re
 import sys
 
+from _md_utils import BULLET_PREFIX, NUMLIST_RE, collapse_blank_lines, read_stripped_lines
+
 def convert_to_markdown(input_file, output_file):
     """Convert the extracted PDF text to properly formatted Markdown."""
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    lines = content.split('\n')
+    lines = read_stripped_lines(input_file)
     markdown_lines = []
     
     # Known section mappings based on analysis
@@ -24,24 +22,29 @@ def convert_to_markdown(input_file, output_file):
         1239: "Memory Types and Associated Cognitive Processes in CogPrime"
     }
     
-    subsection_patterns = [
-        (38, "AI versus AGI"),
-        (81, "What's the Secret Sauce?"),
-        (120, "What Kind of \"Intelligence\" is CogPrime Aimed At?"),
-        (175, "Key Claims"),
-        (281, "Current and Prior Applications of OpenCog"),
-        (347, "Transitioning from Virtual Agents to a Physical Robot")
-    ]
+    subsection_patterns = {
+        38: "AI versus AGI",
+        81: "What's the Secret Sauce?",
+        120: "What Kind of \"Intelligence\" is CogPrime Aimed At?",
+        175: "Key Claims",
+        281: "Current and Prior Applications of OpenCog",
+        347: "Transitioning from Virtual Agents to a Physical Robot"
+    }
     
     i = 0
     section_num = 1
     
-    while i < len(lines):
-        line = lines[i].strip()
+    # Bound once: the loop below calls these for every line
+    append = markdown_lines.append
+    num_lines = len(lines)
+    match_numbered_list = NUMLIST_RE.match
+    
+    while i < num_lines:
+        line = lines[i]
         
         # Handle title
         if i == 0:
-            markdown_lines.append(f"# {line}")
+            append(f"# {line}")
             i += 1
             continue
         elif i == 1:
@@ -51,91 +54,76 @@ def convert_to_markdown(input_file, output_file):
             
         # Handle author and date
         if line == "Ben Goertzel":
-            markdown_lines.append(f"**{line}**")
-            markdown_lines.append("")
+            append(f"**{line}**")
+            append("")
             i += 1
             continue
         elif line == "October 2, 2012":
-            markdown_lines.append(f"**{line}**")
-            markdown_lines.append("")
+            append(f"**{line}**")
+            append("")
             i += 1
             continue
             
         # Handle Abstract
         if line == "Abstract":
-            markdown_lines.append("## Abstract")
-            markdown_lines.append("")
+            append("## Abstract")
+            append("")
             i += 1
             # Process abstract content
-            while i < len(lines) and i < 14:  # Abstract ends before Introduction
-                abstract_line = lines[i].strip()
+            while i < num_lines and i < 14:  # Abstract ends before Introduction
+                abstract_line = lines[i]
                 if abstract_line and not abstract_line.isdigit():
-                    markdown_lines.append(abstract_line)
+                    append(abstract_line)
                 elif not abstract_line:
-                    markdown_lines.append("")
+                    append("")
                 i += 1
             continue
             
         # Handle main sections
-        if i in section_headers:
-            markdown_lines.append(f"## {section_num}. {section_headers[i]}")
-            markdown_lines.append("")
+        title = section_headers.get(i)
+        if title is not None:
+            append(f"## {section_num}. {title}")
+            append("")
             section_num += 1
             i += 1
             continue
             
         # Handle subsections  
-        subsection_found = False
-        for line_num, title in subsection_patterns:
-            if i == line_num:
-                markdown_lines.append(f"### {title}")
-                markdown_lines.append("")
-                subsection_found = True
-                break
-        if subsection_found:
+        title = subsection_patterns.get(i)
+        if title is not None:
+            append(f"### {title}")
+            append("")
             i += 1
             continue
             
         # Handle numbered lists
-        if re.match(r'^\d+\.\s', line):
-            markdown_lines.append(f"{line}")
+        if match_numbered_list(line):
+            append(line)
             i += 1
             continue
             
         # Handle bullet points
-        if line.startswith('•'):
-            markdown_lines.append(f"- {line[1:].strip()}")
+        if line.startswith(BULLET_PREFIX):
+            append(f"- {line[1:].strip()}")
             i += 1
             continue
             
         # Skip isolated numbers (likely page numbers)
-        if line.isdigit() and len(line) <= 3:
+        if len(line) <= 3 and line.isdigit():
             i += 1
             continue
             
         # Handle regular content
         if line:
-            markdown_lines.append(line)
+            append(line)
         else:
-            markdown_lines.append("")
+            append("")
             
         i += 1
     
-    # Clean up multiple consecutive empty lines
-    cleaned_lines = []
-    prev_empty = False
-    for line in markdown_lines:
-        if line == "":
-            if not prev_empty:
-                cleaned_lines.append(line)
-            prev_empty = True
-        else:
-            cleaned_lines.append(line)
-            prev_empty = False
-    
-    # Write the markdown content
+    # Write the markdown content, collapsing runs of empty lines
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(cleaned_lines))
+        f.write('\n'.join(collapse_blank_lines(markdown_lines)))
     
     print(f"Converted {input_file} to {output_file}")
 
@@ -9,11 +9,23 @@ from opencog.utilities import initialize_opencog
 from opencog.type_constructors import *
 from opencog.bindlink import execute_atom
 
+# One AtomSpace for all examples: initialize_opencog only runs once
+_shared_atomspace = None
+
+def _get_atomspace():
+    """Return the shared AtomSpace, emptied so each example starts fresh"""
+    global _shared_atomspace
+    if _shared_atomspace is None:
+        _shared_atomspace = AtomSpace()
+        initialize_opencog(_shared_atomspace)
+    else:
+        _shared_atomspace.clear()
+    return _shared_atomspace
+
 def create_basic_atoms():
     """Create basic atoms in the AtomSpace"""
     # Initialize AtomSpace
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _get_atomspace()
     
     # Create concept nodes
     cat = ConceptNode("cat")
@@ -34,8 +46,7 @@ def create_basic_atoms():
 
 def work_with_truth_values():
     """Demonstrate truth value operations"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _get_atomspace()
     
     # Create atom with truth value
     cat = ConceptNode("cat")
@@ -60,8 +71,7 @@ def work_with_truth_values():
 
 def pattern_matching_example():
     """Demonstrate pattern matching with queries"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _get_atomspace()
     
     # Add some knowledge
     john = ConceptNode("John")
@@ -95,8 +105,7 @@ def pattern_matching_example():
 
 def hierarchical_knowledge():
     """Build and query hierarchical knowledge"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _get_atomspace()
     
     # Create taxonomy
     animals = [
@@ -108,11 +117,12 @@ def hierarchical_knowledge():
         ("eagle", "bird")
     ]
     
-    # Add inheritance relationships
+    # One ConceptNode per distinct name ("mammal", "bird" are both child
+    # and parent), then add inheritance relationships
+    names = dict.fromkeys(name for pair in animals for name in pair)
+    concepts = {name: ConceptNode(name) for name in names}
     for child, parent in animals:
-        child_node = ConceptNode(child)
-        parent_node = ConceptNode(parent)
-        InheritanceLink(child_node, parent_node)
+        InheritanceLink(concepts[child], concepts[parent])
         
     print("Created taxonomic hierarchy:")
     for child, parent in animals:
@@ -122,7 +132,7 @@ def hierarchical_knowledge():
     var_mammal = VariableNode("$mammal")
     mammal_query = GetLink(
         var_mammal,
-        InheritanceLink(var_mammal, ConceptNode("mammal"))
+        InheritanceLink(var_mammal, concepts["mammal"])
     )
     
     print("\nQuerying for mammals:")
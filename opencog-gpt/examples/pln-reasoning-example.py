@@ -4,20 +4,37 @@ PLN Reasoning Example
 Demonstrates probabilistic logic networks inference
 """
 
+import io
+from functools import cache, lru_cache
+
 from opencog.atomspace import AtomSpace, TruthValue
+from opencog.scheme import scheme_eval
 from opencog.utilities import initialize_opencog
 from opencog.type_constructors import *
 from opencog.pln import *
 
-def setup_knowledge_base():
-    """Create a knowledge base for reasoning"""
+# Node constructors memoized by name; atoms belong to the current
+# AtomSpace, so _new_atomspace() clears them
+_C = lru_cache(maxsize=None)(ConceptNode)
+_P = lru_cache(maxsize=None)(PredicateNode)
+
+def _new_atomspace():
+    """Create an AtomSpace, make it the default, and reset the node caches"""
     atomspace = AtomSpace()
     initialize_opencog(atomspace)
+    _C.cache_clear()
+    _P.cache_clear()
+    _build_weather_kb.cache_clear()
+    return atomspace
+
+def setup_knowledge_base():
+    """Create a knowledge base for reasoning"""
+    atomspace = _new_atomspace()
     
     # Create concepts
-    socrates = ConceptNode("Socrates")
-    man = ConceptNode("Man")  
-    mortal = ConceptNode("Mortal")
+    socrates = _C("Socrates")
+    man = _C("Man")  
+    mortal = _C("Mortal")
     
     # Add knowledge with truth values
     # "Socrates is a man" with high confidence
@@ -39,8 +56,8 @@ def deduction_example():
     atomspace = setup_knowledge_base()
     
     # Query: Is Socrates mortal?
-    socrates = ConceptNode("Socrates")
-    mortal = ConceptNode("Mortal")
+    socrates = _C("Socrates")
+    mortal = _C("Mortal")
     
     # Create target for backward chaining
     target = InheritanceLink(socrates, mortal)
@@ -60,29 +77,29 @@ def deduction_example():
 
 def induction_example():
     """Demonstrate inductive reasoning"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _new_atomspace()
     
     # Observations: multiple birds that can fly
     birds = ["robin", "eagle", "sparrow", "hawk"]
-    can_fly = PredicateNode("can_fly")
+    can_fly = _P("can_fly")
     
+    # Write all observations as one Atomese program, evaluated in a single call
+    observations = io.StringIO()
+    observations.write("(begin\n")
     print("Observations (induction data):")
     for bird_name in birds:
-        bird = ConceptNode(bird_name)
-        bird_type = ConceptNode("bird")
-        
-        # Bird is a type of bird
-        InheritanceLink(bird, bird_type).tv = TruthValue(0.9, 0.8)
-        
-        # This specific bird can fly
-        fly_eval = EvaluationLink(can_fly, bird)
-        fly_eval.tv = TruthValue(0.85, 0.7)
+        # Bird is a type of bird, and this specific bird can fly
+        observations.write(
+            f'(InheritanceLink (stv 0.9 0.8) (ConceptNode "{bird_name}") (ConceptNode "bird"))\n'
+            f'(EvaluationLink (stv 0.85 0.7) (PredicateNode "can_fly") (ConceptNode "{bird_name}"))\n'
+        )
         
         print(f"  {bird_name} is a bird and can fly")
+    observations.write(")")
+    scheme_eval(atomspace, observations.getvalue())
     
     # Try to induce: Do birds generally fly?
-    bird_concept = ConceptNode("bird")
+    bird_concept = _C("bird")
     general_fly = EvaluationLink(can_fly, bird_concept)
     
     print(f"\nInduction target: {general_fly}")
@@ -90,16 +107,22 @@ def induction_example():
     # This would require custom induction rules or MOSES integration
     print("Note: Full induction requires additional PLN rule configuration")
 
-def uncertain_reasoning():
-    """Demonstrate reasoning with uncertainty"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+@cache
+def _build_weather_kb():
+    """
+    Build the weather knowledge base once
+    
+    Returns (atomspace, rain, umbrella_needed, sunny_picnic, rain_umbrella);
+    later calls return the same atoms, so queries only update truth values,
+    until _new_atomspace() replaces the default AtomSpace and clears them.
+    """
+    atomspace = _new_atomspace()
     
     # Uncertain knowledge about weather and activities
-    sunny = ConceptNode("sunny")
-    rain = ConceptNode("rain")
-    umbrella_needed = ConceptNode("umbrella_needed")
-    picnic_good = ConceptNode("picnic_good")
+    sunny = _C("sunny")
+    rain = _C("rain")
+    umbrella_needed = _C("umbrella_needed")
+    picnic_good = _C("picnic_good")
     
     # Probabilistic rules
     # "If it's sunny, picnic is probably good"
@@ -110,9 +133,20 @@ def uncertain_reasoning():
     rain_umbrella = ImplicationLink(rain, umbrella_needed) 
     rain_umbrella.tv = TruthValue(0.95, 0.9)
     
+    return atomspace, rain, umbrella_needed, sunny_picnic, rain_umbrella
+
+def run_query(rain_tv):
+    """Set the current rain observation in the weather knowledge base and return it"""
+    rain = _build_weather_kb()[1]
+    rain.tv = rain_tv
+    return rain
+
+def uncertain_reasoning():
+    """Demonstrate reasoning with uncertainty"""
+    _, _, umbrella_needed, sunny_picnic, rain_umbrella = _build_weather_kb()
+    
     # Current observation: "It looks like rain"
-    current_rain = rain
-    current_rain.tv = TruthValue(0.6, 0.5)  # Uncertain
+    current_rain = run_query(TruthValue(0.6, 0.5))  # Uncertain
     
     print("Uncertain reasoning scenario:")
     print(f"  {sunny_picnic} {sunny_picnic.tv}")
@@ -128,8 +162,7 @@ def uncertain_reasoning():
 
 def create_pln_config():
     """Create and configure PLN reasoner"""
-    atomspace = AtomSpace()
-    initialize_opencog(atomspace)
+    atomspace = _new_atomspace()
     
     # Configure PLN parameters
     config = {
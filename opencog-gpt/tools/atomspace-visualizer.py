@@ -4,60 +4,326 @@ AtomSpace Visualizer Tool
 Creates visual representations of OpenCog AtomSpace contents
 """
 
+import itertools
 import json
+import math
+import os
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 from typing import Dict, List, Set, Tuple
 import argparse
+from enum import IntEnum
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional: the BFS then runs on scipy or as plain Python
+    njit = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse import csgraph
+except ImportError:  # scipy is optional: without it or numba the BFS runs as plain Python
+    csgraph = None
+
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+    import pandas as pd
+    from datashader.bundling import connect_edges
+except ImportError:  # datashader is optional: large graphs are then drawn with matplotlib
+    ds = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional: input files are then parsed in one piece
+    ijson = None
+
+# Errors raised for malformed JSON input by the available parsers
+JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+# Node color by atom type
+COLOR_MAP = {
+    'ConceptNode': '#FF6B6B',      # Red
+    'PredicateNode': '#4ECDC4',    # Teal  
+    'VariableNode': '#45B7D1',     # Blue
+    'NumberNode': '#96CEB4',       # Green
+    'SchemaNode': '#FFEAA7',       # Yellow
+    'ListLink': '#DDA0DD',         # Plum
+    'InheritanceLink': '#98D8C8',  # Mint
+    'EvaluationLink': '#F7DC6F',   # Light Yellow
+    'ImplicationLink': '#BB8FCE',  # Light Purple
+    'SimilarityLink': '#85C1E9'    # Light Blue
+}
+DEFAULT_COLOR = '#CCCCCC'  # Default gray
+DEFAULT_SIZE = 300
+
+# Above this many nodes the spring layout uses graphviz sfdp when available
+SFDP_MIN_NODES = 500
+
+# From this many nodes the all-pairs BFS is split across processes
+PARALLEL_BFS_MIN_NODES = 2000
+
+# Distance matrix entries per scipy shortest_path call, bounding its memory (32 MB)
+BFS_BLOCK_ENTRIES = 1 << 22
+
+# Above this many nodes a saved figure is rendered with datashader when available
+DATASHADER_MIN_NODES = 10000
+
+# Type code per atom type: index into COLOR_PALETTE, 0 for unknown types
+AtomType = IntEnum('AtomType', list(COLOR_MAP), start=1)
+_TYPE_CODES = {atom_type.name: atom_type.value for atom_type in AtomType}
+COLOR_PALETTE = np.array([DEFAULT_COLOR, *COLOR_MAP.values()])
+
+def _bfs_distance_totals(indptr, indices, dist, queue, start, stop) -> Tuple[int, int]:
+    """
+    Breadth-first search from nodes start..stop-1 of an undirected CSR graph
+    
+    dist and queue are scratch buffers with one slot per node. Returns
+    (largest distance, sum of distances over all reachable pairs from
+    those sources). Written with plain indexing only, so it runs on lists
+    as Python and on arrays under numba.njit.
+    """
+    n = len(dist)
+    diameter = 0
+    total = 0
+    for source in range(start, stop):
+        for v in range(n):
+            dist[v] = -1
+        dist[source] = 0
+        queue[0] = source
+        head = 0
+        tail = 1
+        while head < tail:
+            u = queue[head]
+            head += 1
+            next_dist = dist[u] + 1
+            for k in range(indptr[u], indptr[u + 1]):
+                w = indices[k]
+                if dist[w] < 0:
+                    dist[w] = next_dist
+                    queue[tail] = w
+                    tail += 1
+                    total += next_dist
+                    if next_dist > diameter:
+                        diameter = next_dist
+    return diameter, total
+
+_bfs_distance_totals_jit = njit(cache=True)(_bfs_distance_totals) if njit is not None else None
+
+def _bfs_source_range(indptr: np.ndarray, indices: np.ndarray, start: int, stop: int) -> Tuple[int, int]:
+    """_bfs_distance_totals over a CSR graph for sources start..stop-1, with fresh buffers"""
+    n = len(indptr) - 1
+    if _bfs_distance_totals_jit is not None:
+        diameter, total = _bfs_distance_totals_jit(indptr, indices, np.empty(n, np.int64),
+                                                   np.empty(n, np.int64), start, stop)
+        return int(diameter), int(total)
+    if csgraph is not None:
+        # scipy's BFS runs in C; sources go in blocks to bound the distance matrix
+        adjacency = csr_matrix((np.ones(len(indices), np.int8), indices, indptr), shape=(n, n))
+        block = max(1, BFS_BLOCK_ENTRIES // max(n, 1))
+        diameter = total = 0
+        for block_start in range(start, stop, block):
+            sources = np.arange(block_start, min(block_start + block, stop))
+            dist = csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=sources)
+            reachable = dist[np.isfinite(dist)]
+            if reachable.size:
+                diameter = max(diameter, int(reachable.max()))
+                total += int(reachable.sum())
+        return diameter, total
+    return _bfs_distance_totals(indptr.tolist(), indices.tolist(), [0] * n, [0] * n, start, stop)
+
+def _bfs_from(indptr, indices, source, dist, queue) -> int:
+    """
+    Breadth-first search from source over an undirected CSR graph
+    
+    Fills dist (-1 for unreached nodes) and queue in visiting order, and
+    returns the number of nodes reached, so queue[count - 1] is a farthest
+    node. Plain indexing only, like _bfs_distance_totals.
+    """
+    for v in range(len(dist)):
+        dist[v] = -1
+    dist[source] = 0
+    queue[0] = source
+    head = 0
+    tail = 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for k in range(indptr[u], indptr[u + 1]):
+            w = indices[k]
+            if dist[w] < 0:
+                dist[w] = dist[u] + 1
+                queue[tail] = w
+                tail += 1
+    return tail
+
+def _ifub_diameter(indptr, indices, dist, queue, order, depth, bfs) -> int:
+    """
+    Exact diameter of a connected undirected CSR graph by iFUB
+    
+    A double sweep gives a lower bound and a central node u. The nodes at
+    distance i from u (the fringe) are then searched for decreasing i:
+    two nodes both closer than i to u are at most 2(i - 1) apart, so the
+    search stops once the largest eccentricity found reaches that bound,
+    typically after far fewer BFS runs than one per node. dist, queue,
+    order and depth are scratch buffers with one slot per node; bfs is
+    _bfs_from, passed in so the numba variant calls its compiled twin.
+    """
+    n = len(dist)
+    
+    # Double sweep: a farthest node a from node 0, then b farthest from a
+    a = queue[bfs(indptr, indices, 0, dist, queue) - 1]
+    b = queue[bfs(indptr, indices, a, dist, queue) - 1]
+    lower = dist[b]
+    
+    # Start from the middle of a shortest a-b path, walking back from b
+    u = b
+    for _ in range(lower // 2):
+        for k in range(indptr[u], indptr[u + 1]):
+            w = indices[k]
+            if dist[w] == dist[u] - 1:
+                u = w
+                break
+    
+    # Nodes by distance from u: order[j] is at distance depth[j], ascending
+    bfs(indptr, indices, u, dist, queue)
+    for j in range(n):
+        order[j] = queue[j]
+        depth[j] = dist[queue[j]]
+    
+    i = depth[n - 1]
+    if i > lower:
+        lower = i
+    upper = 2 * i
+    end = n
+    while upper > lower:
+        # Largest eccentricity among the fringe at distance i
+        start = end
+        while start > 0 and depth[start - 1] == i:
+            start -= 1
+        for j in range(start, end):
+            eccentricity = dist[queue[bfs(indptr, indices, order[j], dist, queue) - 1]]
+            if eccentricity > lower:
+                lower = eccentricity
+        end = start
+        if lower > 2 * (i - 1):
+            break
+        upper = 2 * (i - 1)
+        i -= 1
+    return lower
+
+if njit is not None:
+    _bfs_from_jit = njit(cache=True)(_bfs_from)
+    _ifub_diameter_jit = njit(cache=True)(_ifub_diameter)
+else:
+    _bfs_from_jit = _ifub_diameter_jit = None
 
 class AtomSpaceVisualizer:
     """Visualize AtomSpace graphs and relationships"""
     
     def __init__(self):
         self.graph = nx.DiGraph()
-        self.node_colors = {}
-        self.node_sizes = {}
-        self.edge_labels = {}
         
-    def add_atom(self, atom_id: str, atom_type: str, name: str = None, 
+        # Per-atom columns (struct of arrays), one row per atom; the graph
+        # itself only holds topology. _sti is NaN for atoms without an STI,
+        # _tv holds (strength, confidence) and is NaN for atoms without a
+        # truth value, and _other_types names the types outside COLOR_MAP
+        self._rows: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._type_codes = np.zeros(16, dtype=np.int8)
+        self._other_types: Dict[int, str] = {}
+        self._sti = np.full(16, np.nan)
+        self._tv = np.full((16, 2), np.nan)
+        
+        # Suffixes for atoms without an id
+        self._anonymous_ids = itertools.count()
+        
+        # Graph mutation counter, and the drawing styles computed at a given count
+        self._dirty = 0
+        self._cache = {}
+        
+        # Artists of the last interactive visualization, reused by update()
+        self._fig = None
+        self._pos = None
+        self._node_coll = None
+        self._edge_artists = None
+        self._label_texts = {}
+        self._edge_label_texts = {}
+        self._background = None
+    
+    @property
+    def edge_labels(self) -> Dict[Tuple[str, str], str]:
+        """Order label per edge, read from the edges' order attribute"""
+        return {(u, v): str(order) for u, v, order in self.graph.edges(data='order')}
+    
+    @property
+    def node_colors(self) -> Dict[str, str]:
+        """Node color per atom id"""
+        n = len(self._rows)
+        return dict(zip(self._rows, COLOR_PALETTE[self._type_codes[:n]].tolist()))
+    
+    @property
+    def node_sizes(self) -> Dict[str, float]:
+        """Node size per atom id"""
+        n = len(self._rows)
+        return dict(zip(self._rows, self._node_sizes(self._sti[:n]).tolist()))
+    
+    @property
+    def truth_values(self) -> Dict[str, Dict[str, float]]:
+        """Truth value per atom id, for atoms that have one"""
+        tv = self._tv[:len(self._rows)]
+        return {atom_id: {'strength': strength, 'confidence': confidence}
+                for atom_id, (strength, confidence), has_tv
+                in zip(self._rows, tv.tolist(), ~np.isnan(tv[:, 0]))
+                if has_tv}
+    
+    @staticmethod
+    def _node_sizes(sti: np.ndarray) -> np.ndarray:
+        """Node sizes from STI values: 300 + 10 * STI clamped to [100, 1000], default for NaN"""
+        return np.where(np.isnan(sti), DEFAULT_SIZE, np.clip(DEFAULT_SIZE + sti * 10, 100, 1000))
+        
+    def add_atom(self, atom_id: str, atom_type, name: str = None, 
                  truth_value: Dict = None, attention_value: Dict = None):
-        """Add an atom to the visualization graph"""
-        
-        # Determine node color based on type
-        color_map = {
-            'ConceptNode': '#FF6B6B',      # Red
-            'PredicateNode': '#4ECDC4',    # Teal  
-            'VariableNode': '#45B7D1',     # Blue
-            'NumberNode': '#96CEB4',       # Green
-            'SchemaNode': '#FFEAA7',       # Yellow
-            'ListLink': '#DDA0DD',         # Plum
-            'InheritanceLink': '#98D8C8',  # Mint
-            'EvaluationLink': '#F7DC6F',   # Light Yellow
-            'ImplicationLink': '#BB8FCE',  # Light Purple
-            'SimilarityLink': '#85C1E9'    # Light Blue
-        }
+        """
+        Add an atom to the visualization graph
         
-        color = color_map.get(atom_type, '#CCCCCC')  # Default gray
-        self.node_colors[atom_id] = color
+        atom_type is a type name or an AtomType code.
+        """
+        type_code = atom_type if isinstance(atom_type, int) else _TYPE_CODES.get(atom_type, 0)
         
-        # Determine node size based on attention value
-        size = 300  # Default size
+        row = self._rows.get(atom_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._sti):
+                # Grow the columns geometrically, like list over-allocation
+                self._type_codes = np.concatenate([self._type_codes, np.zeros(row, dtype=np.int8)])
+                self._sti = np.concatenate([self._sti, np.full(row, np.nan)])
+                self._tv = np.concatenate([self._tv, np.full((row, 2), np.nan)])
+            self._rows[atom_id] = row
+            self._names.append(name)
+            self.graph.add_node(atom_id)
+        else:
+            self._names[row] = name
+        
+        # Node color follows the type, node size the attention value
+        self._dirty += 1
+        self._type_codes[row] = type_code
+        if type_code:
+            self._other_types.pop(row, None)
+        else:
+            self._other_types[row] = atom_type
         if attention_value and 'sti' in attention_value:
-            size = max(100, min(1000, 300 + attention_value['sti'] * 10))
-        self.node_sizes[atom_id] = size
+            self._sti[row] = attention_value['sti']
+        else:
+            self._sti[row] = np.nan
         
-        # Add node with attributes
-        label = name if name else atom_id
+        # Truth value as (strength, confidence)
         if truth_value:
-            tv_str = f"({truth_value.get('strength', 0):.2f}, {truth_value.get('confidence', 0):.2f})"
-            label += f"\nTV: {tv_str}"
-            
-        self.graph.add_node(atom_id, 
-                           type=atom_type,
-                           name=name,
-                           label=label,
-                           truth_value=truth_value,
-                           attention_value=attention_value)
+            self._tv[row] = (truth_value.get('strength', 0), truth_value.get('confidence', 0))
+        else:
+            self._tv[row] = np.nan
     
     def add_link(self, link_id: str, link_type: str, outgoing: List[str], 
                  truth_value: Dict = None):
@@ -67,9 +333,9 @@ class AtomSpaceVisualizer:
         self.add_atom(link_id, link_type, truth_value=truth_value)
         
         # Connect link to its outgoing atoms
+        self._dirty += 1
         for i, target_id in enumerate(outgoing):
             self.graph.add_edge(link_id, target_id, order=i)
-            self.edge_labels[(link_id, target_id)] = str(i)
     
     def load_from_json(self, json_data: Dict):
         """Load AtomSpace from JSON representation"""
@@ -78,60 +344,110 @@ class AtomSpaceVisualizer:
             raise ValueError("JSON must contain 'atoms' field")
             
         for atom in json_data['atoms']:
-            atom_id = atom.get('id', f"{atom['type']}_{id(atom)}")
+            self._ingest(atom)
+    
+    def load_from_file(self, path: str):
+        """
+        Load AtomSpace from a JSON file
+        
+        With ijson installed the atoms are parsed and added one at a time,
+        so memory stays proportional to one atom rather than the whole
+        file; a file without an 'atoms' field then loads as empty.
+        """
+        if ijson is None:
+            with open(path, 'r') as f:
+                self.load_from_json(json.load(f))
+            return
+        
+        with open(path, 'rb') as f:
+            for atom in ijson.items(f, 'atoms.item', use_float=True):
+                self._ingest(atom)
+    
+    def _atom_id(self, atom: Dict) -> str:
+        """Id of an atom record, made up from its type for atoms without one"""
+        if 'id' in atom:
+            return atom['id']
+        return f"{atom['type']}_{next(self._anonymous_ids)}"
+    
+    def _ingest(self, atom: Dict):
+        """Add one atom record from the JSON representation"""
+        atom_id = self._atom_id(atom)
+        
+        if atom['type'] == 'Node':
+            self.add_atom(
+                atom_id, 
+                atom.get('node_type', 'Node'),
+                atom.get('name'),
+                atom.get('truth_value'),
+                atom.get('attention_value')
+            )
+        elif atom['type'] == 'Link':
+            # Resolve outgoing ids once, adding inline nodes first
+            outgoing_ids = []
+            for out_atom in atom.get('outgoing', []):
+                if isinstance(out_atom, dict):
+                    out_id = self._atom_id(out_atom)
+                    if out_atom['type'] == 'Node':
+                        self.add_atom(
+                            out_id,
+                            out_atom.get('node_type', 'Node'), 
+                            out_atom.get('name'),
+                            out_atom.get('truth_value'),
+                            out_atom.get('attention_value')
+                        )
+                    outgoing_ids.append(out_id)
+                else:
+                    outgoing_ids.append(out_atom)
             
-            if atom['type'] == 'Node':
-                self.add_atom(
-                    atom_id, 
-                    atom.get('node_type', 'Node'),
-                    atom.get('name'),
-                    atom.get('truth_value'),
-                    atom.get('attention_value')
-                )
-            elif atom['type'] == 'Link':
-                # First ensure outgoing atoms exist
-                outgoing = atom.get('outgoing', [])
-                for out_atom in outgoing:
-                    if isinstance(out_atom, dict):
-                        out_id = out_atom.get('id', f"{out_atom['type']}_{id(out_atom)}")
-                        if out_atom['type'] == 'Node':
-                            self.add_atom(
-                                out_id,
-                                out_atom.get('node_type', 'Node'), 
-                                out_atom.get('name'),
-                                out_atom.get('truth_value'),
-                                out_atom.get('attention_value')
-                            )
-                
-                # Then add the link
-                outgoing_ids = [
-                    out.get('id', f"{out['type']}_{id(out)}") if isinstance(out, dict) else out
-                    for out in outgoing
-                ]
-                self.add_link(
-                    atom_id,
-                    atom.get('link_type', 'Link'),
-                    outgoing_ids,
-                    atom.get('truth_value')
-                )
+            # Then add the link
+            self.add_link(
+                atom_id,
+                atom.get('link_type', 'Link'),
+                outgoing_ids,
+                atom.get('truth_value')
+            )
     
     def visualize(self, title: str = "AtomSpace Visualization", 
                   figsize: Tuple[int, int] = (12, 8),
                   layout: str = 'spring',
                   show_labels: bool = True,
                   show_truth_values: bool = True,
-                  save_path: str = None):
-        """Create and display the visualization"""
+                  save_path: str = None,
+                  interactive: bool = False,
+                  backend: str = 'auto',
+                  max_edge_labels: int = None):
+        """
+        Create and display the visualization
+        
+        With save_path the figure is written to that file instead of shown.
+        backend 'datashader' rasterizes it into a fixed-size image, without
+        labels, so the cost follows the pixel count rather than the graph
+        size; 'auto' does so above DATASHADER_MIN_NODES nodes when
+        datashader is installed, and uses matplotlib otherwise.
+        
+        With interactive=True the figure is shown without blocking and its
+        artists are kept, so update() can move or restyle the nodes without
+        redrawing the whole graph.
+        
+        max_edge_labels skips the link order labels on graphs with more
+        edges than that; by default they are always drawn.
+        """
         
         if len(self.graph.nodes()) == 0:
             print("No atoms to visualize")
             return
-            
-        plt.figure(figsize=figsize)
+        
+        if backend == 'auto':
+            backend = ('datashader' if ds is not None and save_path and not interactive
+                       and self.graph.number_of_nodes() > DATASHADER_MIN_NODES else 'matplotlib')
+        if backend == 'datashader' and (ds is None or not save_path):
+            raise ValueError("The datashader backend needs datashader installed and a save_path")
         
         # Choose layout algorithm
         if layout == 'spring':
-            pos = nx.spring_layout(self.graph, k=2, iterations=50)
+            pos = self._spring_layout()
+        elif layout == 'spectral':
+            pos = self._spectral_layout()
         elif layout == 'circular':
             pos = nx.circular_layout(self.graph)
         elif layout == 'hierarchical':
@@ -139,41 +455,39 @@ class AtomSpaceVisualizer:
         else:
             pos = nx.spring_layout(self.graph)
         
-        # Draw nodes
-        node_colors_list = [self.node_colors.get(node, '#CCCCCC') for node in self.graph.nodes()]
-        node_sizes_list = [self.node_sizes.get(node, 300) for node in self.graph.nodes()]
+        if backend == 'datashader':
+            self._render_datashader(pos, save_path)
+            return
+        
+        fig = plt.figure(figsize=figsize)
         
-        nx.draw_networkx_nodes(self.graph, pos, 
-                              node_color=node_colors_list,
-                              node_size=node_sizes_list,
+        # Draw nodes
+        colors, sizes = self._node_styles()
+        node_coll = nx.draw_networkx_nodes(self.graph, pos, 
+                              node_color=colors,
+                              node_size=sizes,
                               alpha=0.8)
         
         # Draw edges
-        nx.draw_networkx_edges(self.graph, pos,
+        edge_artists = nx.draw_networkx_edges(self.graph, pos,
                               edge_color='gray',
                               arrows=True,
                               arrowsize=20,
                               alpha=0.6)
         
         # Draw labels
+        label_texts = {}
         if show_labels:
-            labels = {}
-            for node in self.graph.nodes():
-                node_data = self.graph.nodes[node]
-                label = node_data.get('name', node)
-                
-                if show_truth_values and node_data.get('truth_value'):
-                    tv = node_data['truth_value']
-                    tv_str = f"({tv.get('strength', 0):.2f},{tv.get('confidence', 0):.2f})"
-                    label += f"\n{tv_str}"
-                    
-                labels[node] = label
-                
-            nx.draw_networkx_labels(self.graph, pos, labels, font_size=8)
+            labels = self._node_labels(show_truth_values)
+            label_texts = nx.draw_networkx_labels(self.graph, pos, labels, font_size=8)
         
         # Draw edge labels (for link order)
-        if self.edge_labels:
-            nx.draw_networkx_edge_labels(self.graph, pos, self.edge_labels, font_size=6)
+        edge_label_texts = {}
+        num_edges = self.graph.number_of_edges()
+        if max_edge_labels is not None and num_edges > max_edge_labels:
+            print(f"Edge labels skipped: {num_edges} edges exceed max_edge_labels={max_edge_labels}")
+        elif num_edges:
+            edge_label_texts = nx.draw_networkx_edge_labels(self.graph, pos, self.edge_labels, font_size=6)
         
         plt.title(title, fontsize=16, fontweight='bold')
         plt.axis('off')
@@ -183,10 +497,239 @@ class AtomSpaceVisualizer:
             plt.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"Visualization saved to {save_path}")
         
-        plt.show()
+        if not interactive:
+            if save_path:
+                plt.close(fig)
+            else:
+                plt.show()
+            return
+        
+        self._fig = fig
+        self._pos = pos
+        self._node_coll = node_coll
+        self._edge_artists = edge_artists
+        self._label_texts = label_texts
+        self._edge_label_texts = edge_label_texts
+        self._background = None
+        if fig.canvas.supports_blit:
+            # Nodes are drawn over a cached background when only their style changes
+            node_coll.set_animated(True)
+            fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.show(block=False)
     
-    def get_statistics(self) -> Dict:
-        """Get statistics about the AtomSpace graph"""
+    def _render_datashader(self, pos: Dict, save_path: str,
+                           width: int = 1600, height: int = 1200):
+        """Rasterize nodes and edges at the given positions into an image file"""
+        index = {node: i for i, node in enumerate(self.graph)}
+        xy = np.array([pos[node] for node in self.graph], dtype=float)
+        colors, _ = self._node_styles()
+        nodes = pd.DataFrame({
+            'x': xy[:, 0],
+            'y': xy[:, 1],
+            'color': pd.Categorical(colors, categories=COLOR_PALETTE.tolist())
+        })
+        edges = pd.DataFrame([(index[u], index[v]) for u, v in self.graph.edges()],
+                             columns=['source', 'target'])
+        
+        canvas = ds.Canvas(plot_width=width, plot_height=height,
+                           x_range=(xy[:, 0].min(), xy[:, 0].max()),
+                           y_range=(xy[:, 1].min(), xy[:, 1].max()))
+        edge_image = tf.shade(canvas.line(connect_edges(nodes, edges), 'x', 'y', agg=ds.count()),
+                              cmap=['#DDDDDD', '#808080'])
+        node_image = tf.spread(tf.shade(canvas.points(nodes, 'x', 'y', agg=ds.count_cat('color')),
+                                        color_key=COLOR_PALETTE.tolist()), px=2)
+        
+        tf.stack(edge_image, node_image).to_pil().save(save_path)
+        print(f"Visualization saved to {save_path}")
+    
+    def _drawing_cache(self) -> Dict:
+        """Values computed for drawing the current graph, emptied whenever it changes"""
+        if self._cache.get('dirty') != self._dirty:
+            self._cache = {'dirty': self._dirty}
+        return self._cache
+    
+    def _node_rows(self) -> np.ndarray:
+        """Column row of each node in graph order, cached until the graph changes"""
+        cache = self._drawing_cache()
+        if 'rows' not in cache:
+            # Link targets that were never added as atoms get an extra
+            # default row, one past the last atom
+            n = len(self._rows)
+            cache['rows'] = np.fromiter((self._rows.get(node, n) for node in self.graph.nodes()),
+                                        dtype=np.intp, count=self.graph.number_of_nodes())
+        return cache['rows']
+    
+    def _node_styles(self) -> Tuple[List[str], np.ndarray]:
+        """Node colors and sizes in graph order, cached until the graph changes"""
+        cache = self._drawing_cache()
+        if 'colors' not in cache:
+            n = len(self._rows)
+            rows = self._node_rows()
+            type_codes = np.append(self._type_codes[:n], 0)[rows]
+            sti = np.append(self._sti[:n], np.nan)[rows]
+            cache['colors'] = COLOR_PALETTE[type_codes].tolist()
+            cache['sizes'] = self._node_sizes(sti)
+        return cache['colors'], cache['sizes']
+    
+    def _node_labels(self, show_truth_values: bool) -> Dict[str, str]:
+        """Node labels, with truth values if requested, cached until the graph changes"""
+        cache = self._drawing_cache()
+        key = ('labels', show_truth_values)
+        if key not in cache:
+            n = len(self._rows)
+            atom_names = self._names
+            # Links and link targets never added as atoms have no name
+            names = {node: (atom_names[row] if row < n else None) or node
+                     for node, row in zip(self.graph, self._node_rows().tolist())}
+            if show_truth_values:
+                tv = np.append(self._tv[:len(self._rows)], [(np.nan, np.nan)], axis=0)[self._node_rows()]
+                for node, (strength, confidence), has_tv in zip(names, tv.tolist(), ~np.isnan(tv[:, 0])):
+                    if has_tv:
+                        # One f-string: cheaper than formatting the pair and concatenating
+                        names[node] = f"{names[node]}\n({strength:.2f},{confidence:.2f})"
+            cache[key] = names
+        return cache[key]
+    
+    def _on_draw(self, event):
+        """Cache the background behind the nodes after each full draw"""
+        if event is not None and event.canvas.figure is not self._fig:
+            return
+        self._background = self._fig.canvas.copy_from_bbox(self._fig.bbox)
+        self._node_coll.axes.draw_artist(self._node_coll)
+    
+    def update(self, positions: Dict = None, sizes=None, colors=None):
+        """
+        Update the nodes of the last interactive visualization in place
+        
+        positions maps atom ids to (x, y) and may cover only some of the
+        nodes; sizes and colors hold one value per node in graph order.
+        Moving nodes redraws the figure, while restyling them only redraws
+        the nodes over the cached background.
+        """
+        if self._node_coll is None:
+            raise RuntimeError("update() needs a prior visualize(interactive=True)")
+        
+        if sizes is not None:
+            self._node_coll.set_sizes(np.asarray(sizes))
+        if colors is not None:
+            self._node_coll.set_facecolor(colors)
+        
+        canvas = self._fig.canvas
+        if positions is not None:
+            self._pos.update(positions)
+            self._move_artists()
+            canvas.draw_idle()
+        elif self._background is not None:
+            canvas.restore_region(self._background)
+            self._node_coll.axes.draw_artist(self._node_coll)
+            canvas.blit(self._fig.bbox)
+        else:
+            canvas.draw_idle()
+    
+    def _move_artists(self):
+        """Move the cached node, edge and label artists to self._pos"""
+        pos = self._pos
+        self._node_coll.set_offsets(np.array([pos[node] for node in self.graph]))
+        
+        if isinstance(self._edge_artists, list):
+            # Arrowed edges are one FancyArrowPatch per edge, in edge order
+            for (u, v), arrow in zip(self.graph.edges(), self._edge_artists):
+                arrow.set_positions(pos[u], pos[v])
+        elif self._edge_artists is not None:
+            self._edge_artists.set_segments([(pos[u], pos[v]) for u, v in self.graph.edges()])
+        
+        for node, text in self._label_texts.items():
+            text.set_position(pos[node])
+        for (u, v), text in self._edge_label_texts.items():
+            if hasattr(text, 'arrow'):
+                # networkx >= 3.3 places edge labels along their own arrow at draw time
+                text.arrow.set_positions(pos[u], pos[v])
+            else:
+                (x1, y1), (x2, y2) = pos[u], pos[v]
+                text.set_position(((x1 + x2) / 2, (y1 + y2) / 2))
+    
+    def _to_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Undirected adjacency of the graph as CSR (indptr, indices) arrays, nodes in graph order"""
+        index = {node: i for i, node in enumerate(self.graph)}
+        indptr = [0]
+        indices = []
+        for node in self.graph:
+            neighbors = self.graph.succ[node].keys() | self.graph.pred[node].keys()
+            indices.extend(index[neighbor] for neighbor in neighbors)
+            indptr.append(len(indices))
+        return np.array(indptr, dtype=np.int32), np.array(indices, dtype=np.int32)
+    
+    def _path_length_totals(self, max_workers: int = None) -> Tuple[int, int]:
+        """
+        (diameter, sum of shortest path lengths) of the undirected graph, one BFS pass
+        
+        The BFS from each source is independent, so graphs of at least
+        PARALLEL_BFS_MIN_NODES nodes split the sources into chunks across
+        worker processes and combine the per-chunk results.
+        """
+        indptr, indices = self._to_csr()
+        n = len(indptr) - 1
+        workers = max_workers or os.cpu_count() or 1
+        if workers == 1 or n < PARALLEL_BFS_MIN_NODES:
+            return _bfs_source_range(indptr, indices, 0, n)
+        
+        # A few chunks per worker, so uneven chunks still keep every worker busy
+        bounds = np.linspace(0, n, 4 * workers + 1).astype(int).tolist()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_bfs_source_range,
+                                        itertools.repeat(indptr), itertools.repeat(indices),
+                                        bounds[:-1], bounds[1:]))
+        return max(diameter for diameter, _ in results), sum(total for _, total in results)
+    
+    def _diameter(self) -> int:
+        """Diameter of the connected undirected graph by iFUB"""
+        indptr, indices = self._to_csr()
+        n = len(indptr) - 1
+        if _ifub_diameter_jit is not None:
+            buffers = [np.empty(n, np.int64) for _ in range(4)]
+            return int(_ifub_diameter_jit(indptr, indices, *buffers, _bfs_from_jit))
+        return _ifub_diameter(indptr.tolist(), indices.tolist(), [0] * n, [0] * n, [0] * n, [0] * n, _bfs_from)
+    
+    def _spring_layout(self) -> Dict:
+        """
+        Force-directed layout
+        
+        Large graphs use graphviz sfdp (multilevel, Barnes-Hut
+        approximated forces) when pygraphviz is installed; otherwise, and
+        for small graphs, the Fruchterman-Reingold spring layout.
+        """
+        if self.graph.number_of_nodes() > SFDP_MIN_NODES:
+            try:
+                return nx.nx_agraph.graphviz_layout(self.graph, prog='sfdp')
+            except ImportError:
+                pass  # pygraphviz is optional
+        return nx.spring_layout(self.graph, k=2, iterations=50)
+    
+    def _spectral_layout(self) -> Dict:
+        """
+        Spectral layout (Laplacian eigenvectors, via the sparse ARPACK
+        solver for large graphs), one weakly connected component per grid
+        cell since the eigenvectors collapse separate components together
+        """
+        components = sorted(nx.weakly_connected_components(self.graph), key=len, reverse=True)
+        columns = math.ceil(math.sqrt(len(components)))
+        pos = {}
+        for i, nodes in enumerate(components):
+            center = (3.0 * (i % columns), -3.0 * (i // columns))
+            subgraph = self.graph.subgraph(nodes)
+            if len(nodes) <= 2:
+                pos.update(nx.circular_layout(subgraph, center=center))
+            else:
+                pos.update(nx.spectral_layout(subgraph, center=center))
+        return pos
+    
+    def get_statistics(self, path_lengths: bool = True) -> Dict:
+        """
+        Get statistics about the AtomSpace graph
+        
+        With path_lengths=False the average path length, which needs a BFS
+        from every node, is skipped and the diameter comes from iFUB.
+        """
         
         stats = {
             'total_atoms': len(self.graph.nodes()),
@@ -199,25 +742,35 @@ class AtomSpaceVisualizer:
             }
         }
         
-        # Count atom types
-        for node in self.graph.nodes():
-            atom_type = self.graph.nodes[node].get('type', 'Unknown')
-            stats['atom_types'][atom_type] = stats['atom_types'].get(atom_type, 0) + 1
+        # Count atom types: known types by their codes in one bincount,
+        # then the types outside COLOR_MAP (code 0) by name
+        n = len(self._rows)
+        type_codes = self._type_codes[:n]
+        counts = np.bincount(type_codes, minlength=len(COLOR_PALETTE))
+        atom_types = {atom_type.name: int(count) for atom_type, count in zip(AtomType, counts[1:]) if count}
+        for atom_type in self._other_types.values():
+            atom_types[atom_type] = atom_types.get(atom_type, 0) + 1
+        if n < stats['total_atoms']:
+            # Link targets that were never added as atoms
+            atom_types['Unknown'] = atom_types.get('Unknown', 0) + stats['total_atoms'] - n
+        stats['atom_types'] = atom_types
         
-        # Graph connectivity metrics (if connected)
-        if nx.is_weakly_connected(self.graph):
-            try:
-                stats['connectivity']['diameter'] = nx.diameter(self.graph.to_undirected())
-                stats['connectivity']['average_path_length'] = nx.average_shortest_path_length(self.graph.to_undirected())
-            except:
-                pass  # Handle cases where metrics can't be computed
+        # Graph connectivity metrics (if connected), from one all-pairs BFS
+        # over the undirected graph
+        if nx.is_weakly_connected(self.graph) and not path_lengths:
+            stats['connectivity']['diameter'] = self._diameter()
+        elif nx.is_weakly_connected(self.graph):
+            n = len(self.graph)
+            diameter, total = self._path_length_totals()
+            stats['connectivity']['diameter'] = diameter
+            stats['connectivity']['average_path_length'] = total / (n * (n - 1)) if n > 1 else 0
         
         return stats
     
-    def print_statistics(self):
+    def print_statistics(self, path_lengths: bool = True):
         """Print visualization statistics"""
         
-        stats = self.get_statistics()
+        stats = self.get_statistics(path_lengths)
         
         print("AtomSpace Visualization Statistics:")
         print(f"  Total Atoms: {stats['total_atoms']}")
@@ -242,7 +795,7 @@ def main():
     parser.add_argument('--output', '-o', type=str, 
                        help='Output image file path')
     parser.add_argument('--layout', '-l', type=str, default='spring',
-                       choices=['spring', 'circular', 'hierarchical'],
+                       choices=['spring', 'spectral', 'circular', 'hierarchical'],
                        help='Graph layout algorithm')
     parser.add_argument('--title', '-t', type=str, default='AtomSpace Visualization',
                        help='Visualization title')
@@ -250,32 +803,45 @@ def main():
                        help='Hide node labels')
     parser.add_argument('--no-truth-values', action='store_true', 
                        help='Hide truth values in labels')
+    parser.add_argument('--max-edge-labels', type=int,
+                       help='Skip edge labels on graphs with more edges than this')
+    parser.add_argument('--no-path-lengths', action='store_true',
+                       help='Skip the average path length; compute only the diameter')
+    parser.add_argument('--backend', '-b', type=str, default='auto',
+                       choices=['auto', 'matplotlib', 'datashader'],
+                       help='Renderer for the output image')
     
     args = parser.parse_args()
     
-    # Load data
+    if args.output:
+        # Rendering straight to a file needs no GUI backend
+        plt.switch_backend('Agg')
+    
+    # Load data into the visualization
+    visualizer = AtomSpaceVisualizer()
     try:
-        with open(args.input, 'r') as f:
-            data = json.load(f)
+        visualizer.load_from_file(args.input)
     except FileNotFoundError:
         print(f"Error: Input file '{args.input}' not found")
         return
-    except json.JSONDecodeError as e:
+    except JSON_ERRORS as e:
         print(f"Error: Invalid JSON in input file: {e}")
         return
     
-    # Create visualization
-    visualizer = AtomSpaceVisualizer()
-    visualizer.load_from_json(data)
-    visualizer.print_statistics()
-    
-    visualizer.visualize(
-        title=args.title,
-        layout=args.layout,
-        show_labels=not args.no_labels,
-        show_truth_values=not args.no_truth_values,
-        save_path=args.output
-    )
+    visualizer.print_statistics(path_lengths=not args.no_path_lengths)
+    
+    try:
+        visualizer.visualize(
+            title=args.title,
+            layout=args.layout,
+            show_labels=not args.no_labels,
+            show_truth_values=not args.no_truth_values,
+            save_path=args.output,
+            backend=args.backend,
+            max_edge_labels=args.max_edge_labels
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file